@@ -0,0 +1,94 @@
+import numpy as np
+
+from .time_normalization import RELATIVE_TIME_UNIT, format_time_range
+
+def cluster_conflicts(conflicts, time_gap=RELATIVE_TIME_UNIT, distance_gap=10.0):
+    """
+    Merge conflicts between the same pair of flights into conflict episodes.
+
+    Conflicts of one flight pair are ordered by start time and split into a new
+    episode wherever the next conflict starts more than time_gap seconds after
+    everything seen so far has ended, or lies more than distance_gap away from
+    the previous conflict. All grouping and reductions run on NumPy arrays.
+
+    Parameters:
+    conflicts (list): Conflict dicts with 'involved_flights' and numeric 'position',
+                      and optionally 'interval' and 'separation'.
+    time_gap (float): Largest gap in seconds that still counts as the same encounter.
+    distance_gap (float): Largest jump between consecutive conflicts of one encounter.
+
+    Returns:
+    list: One dict per episode with the usual conflict keys ('location', 'time',
+          'involved_flights', 'position', 'interval', 'separation') describing the
+          point of closest approach, plus 'entry_time', 'exit_time',
+          'min_separation' and 'conflict_count'.
+    """
+    if not conflicts:
+        return []
+
+    count = len(conflicts)
+    pair_ids = {}
+    pairs = np.empty(count, dtype=np.int64)
+    positions = np.empty((count, 3))
+    starts = np.full(count, np.nan)
+    ends = np.full(count, np.nan)
+    separations = np.full(count, np.nan)
+    for idx, conflict in enumerate(conflicts):
+        pairs[idx] = pair_ids.setdefault(tuple(sorted(conflict['involved_flights'])), len(pair_ids))
+        positions[idx] = conflict['position']
+        if conflict.get('interval'):
+            starts[idx], ends[idx] = conflict['interval']
+        if conflict.get('separation') is not None:
+            separations[idx] = conflict['separation']
+
+    # Group by flight pair, then by start time (untimed conflicts sort last)
+    order = np.lexsort((starts, pairs))
+    pairs, positions, starts, ends, separations = (
+        pairs[order], positions[order], starts[order], ends[order], separations[order]
+    )
+
+    # Running latest end time within each pair; offsetting each pair above the
+    # previous one keeps the cumulative maximum from leaking across pairs
+    if np.isnan(ends).all():
+        running_end = ends
+    else:
+        base = np.nanmin(ends)
+        offset = pairs * (np.nanmax(ends) - base + 1.0)
+        running_end = np.fmax.accumulate(ends - base + offset) - offset + base
+
+    new_pair = pairs[1:] != pairs[:-1]
+    time_break = starts[1:] - running_end[:-1] > time_gap
+    jumps = np.sqrt(((positions[1:] - positions[:-1]) ** 2).sum(axis=1))
+    space_break = jumps > distance_gap
+    breaks = np.concatenate(([True], new_pair | time_break | space_break))
+
+    episode_starts = np.flatnonzero(breaks)
+    episode_ids = np.cumsum(breaks) - 1
+    entry_times = np.fmin.reduceat(starts, episode_starts)
+    exit_times = np.fmax.reduceat(ends, episode_starts)
+    min_separations = np.fmin.reduceat(separations, episode_starts)
+    conflict_counts = np.diff(np.append(episode_starts, count))
+
+    # Closest conflict of each episode (NaN separations sort last)
+    closest = np.lexsort((separations, episode_ids))[episode_starts]
+
+    episodes = []
+    for episode, member in enumerate(closest):
+        source = conflicts[order[member]]
+        entry_time = None if np.isnan(entry_times[episode]) else float(entry_times[episode])
+        exit_time = None if np.isnan(exit_times[episode]) else float(exit_times[episode])
+        min_separation = None if np.isnan(min_separations[episode]) else float(min_separations[episode])
+        interval = (entry_time, exit_time) if entry_time is not None and exit_time is not None else None
+        episodes.append({
+            'location': source['location'],
+            'time': format_time_range(*interval) if interval else None,
+            'involved_flights': list(source['involved_flights']),
+            'position': tuple(float(v) for v in positions[member]),
+            'interval': interval,
+            'separation': min_separation,
+            'entry_time': entry_time,
+            'exit_time': exit_time,
+            'min_separation': min_separation,
+            'conflict_count': int(conflict_counts[episode])
+        })
+    return episodes
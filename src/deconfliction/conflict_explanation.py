@@ -1,3 +1,26 @@
+def explain_conflict(conflict):
+    """
+    Generate a detailed explanation for one detected conflict.
+
+    Parameters:
+    conflict (dict): A conflict object with the conflict's location, time, and involved flights.
+
+    Returns:
+    str: A string providing a detailed explanation of the conflict.
+    """
+    location = conflict.get('location')
+    time = conflict.get('time')
+    involved_flights = conflict.get('involved_flights')
+    
+    explanation = f"Conflict detected at location {location} during time {time}. "
+    explanation += f"Involved flights: {', '.join(involved_flights)}."
+    return explanation
+
+def iter_explanations(conflicts):
+    """Lazily yield one explanation per conflict, for conflict streams too large to hold in memory."""
+    for conflict in conflicts:
+        yield explain_conflict(conflict)
+
 def explain_conflicts(conflicts):
     """
     Generate detailed explanations for detected conflicts.
@@ -9,16 +32,4 @@ def explain_conflicts(conflicts):
     Returns:
     list: A list of strings, each providing a detailed explanation of a conflict.
     """
-    explanations = []
-    
-    for conflict in conflicts:
-        location = conflict.get('location')
-        time = conflict.get('time')
-        involved_flights = conflict.get('involved_flights')
-        
-        explanation = f"Conflict detected at location {location} during time {time}. "
-        explanation += f"Involved flights: {', '.join(involved_flights)}."
-        
-        explanations.append(explanation)
-    
-    return explanations
\ No newline at end of file
+    return list(iter_explanations(conflicts))
@@ -0,0 +1,181 @@
+import numpy as np
+
+from .time_normalization import normalize_flight, format_time_range
+from .fleet_index import FleetIndex, leg_bounds
+
+def candidate_flights(primary, fleet_index, radius):
+    """
+    Broad phase: indexes of fleet flights with a leg passing within radius of a primary leg.
+
+    Legs are compared as bounding boxes inflated by radius, so encounters between
+    waypoints are found as well as those at waypoints; the test is conservative
+    and the Monte Carlo narrow phase decides the rest.
+    """
+    flights = fleet_index.flights
+    if not flights:
+        return []
+    primary_low, primary_high = leg_bounds(primary['positions'])
+    bounds = [leg_bounds(flight['positions']) for flight in flights]
+    low = np.vstack([flight_low for flight_low, _ in bounds])
+    high = np.vstack([flight_high for _, flight_high in bounds])
+    owners = np.repeat(np.arange(len(flights)), [len(flight_low) for flight_low, _ in bounds])
+
+    near = np.zeros(len(owners), dtype=bool)
+    for chunk in range(0, len(owners), 4096):
+        overlapping = ((primary_low[:, None, :] - radius <= high[None, chunk:chunk + 4096, :]) &
+                       (primary_high[:, None, :] + radius >= low[None, chunk:chunk + 4096, :])).all(axis=2)
+        near[chunk:chunk + 4096] = overlapping.any(axis=0)
+    return np.unique(owners[near]).tolist()
+
+def _timed_track(flight):
+    """Waypoint times and positions of a normalized flight, sorted by time, skipping untimed waypoints."""
+    timed = ~np.isnan(flight['times'])
+    order = np.argsort(flight['times'][timed], kind='stable')
+    return flight['times'][timed][order], flight['positions'][timed][order]
+
+def _sample_positions(times, positions, query_times):
+    """Linearly interpolate a track at query times of any shape; NaN outside the track's time span."""
+    return np.stack([np.interp(query_times, times, positions[:, axis], left=np.nan, right=np.nan)
+                     for axis in range(3)], axis=-1)
+
+def _closest_approach(times1, positions1, times2, positions2, delays, offsets):
+    """
+    Exact closest approach of two tracks for every (delays, offsets) sample.
+
+    The first track is shifted in time by delays[:, 0] and the second by
+    delays[:, 1]; offsets is the difference of their position errors. Between
+    the merged waypoint times of both tracks the relative position is linear, so
+    its minimum on every piece has a closed form. The cost grows with the number
+    of waypoints, not with the duration or speed of the flights.
+
+    Returns:
+    tuple: (separation, time) arrays with one entry per sample; NaN where the
+           shifted tracks do not overlap in time.
+    """
+    shifted1 = times1[None, :] + delays[:, 0, None]
+    shifted2 = times2[None, :] + delays[:, 1, None]
+    low = np.maximum(shifted1[:, 0], shifted2[:, 0])
+    high = np.maximum(np.minimum(shifted1[:, -1], shifted2[:, -1]), low)
+    breaks = np.clip(np.sort(np.hstack([shifted1, shifted2]), axis=1), low[:, None], high[:, None])
+
+    # Clamp at the ends, since breaks minus the delay can round just outside a track
+    relative = np.stack([np.interp(breaks - delays[:, 0, None], times1, positions1[:, axis]) -
+                         np.interp(breaks - delays[:, 1, None], times2, positions2[:, axis])
+                         for axis in range(3)], axis=-1) + offsets[:, None, :]
+    start, step = relative[:, :-1], np.diff(relative, axis=1)
+    length = (step ** 2).sum(axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        fraction = np.where(length > 0, np.clip(-(start * step).sum(axis=-1) / length, 0.0, 1.0), 0.0)
+    distances = np.sqrt(((start + fraction[..., None] * step) ** 2).sum(axis=-1))
+
+    rows = np.arange(len(delays))
+    piece = np.argmin(distances, axis=1)
+    separation = distances[rows, piece]
+    time = breaks[rows, piece] + fraction[rows, piece] * (breaks[rows, piece + 1] - breaks[rows, piece])
+    apart = np.minimum(shifted1[:, -1], shifted2[:, -1]) < low
+    separation[apart] = np.nan
+    time[apart] = np.nan
+    return separation, time
+
+def pair_conflict_probability(flight1, flight2, safety_buffer=2.0, gps_sigma=1.0, timing_jitter=60.0,
+                              samples=2000, rng=None, batch_size=2_000_000):
+    """
+    Monte Carlo probability that two normalized flights come closer than safety_buffer.
+
+    Every sample shifts each flight's schedule by a normally distributed delay
+    (standard deviation timing_jitter seconds) and its whole track by a normally
+    distributed position error (standard deviation gps_sigma per axis, modelling
+    drift that persists over the encounter). The exact closest approach of each
+    sample is computed leg by leg (_closest_approach), so no encounter is missed
+    however long or fast the flights are, and a sample counts as a conflict if it
+    is inside the buffer. Samples are evaluated in batches of at most batch_size
+    (sample, leg) points.
+
+    Returns:
+    dict: Conflict-format fields for the nominal closest approach ('location',
+          'time', 'involved_flights', 'position', 'interval', 'separation') plus
+          'probability', 'std_error' and 'samples'; None if either flight has no
+          timed waypoints or the tracks are further apart in time than the jitter.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    times1, positions1 = _timed_track(flight1)
+    times2, positions2 = _timed_track(flight2)
+    if len(times1) == 0 or len(times2) == 0:
+        return None
+
+    # Overlap of both tracks, widened for the jitter
+    spread = 3 * timing_jitter
+    start = max(times1[0], times2[0]) - spread
+    end = min(times1[-1], times2[-1]) + spread
+    if start > end:
+        return None
+
+    # Nominal closest approach, for reporting where and when the encounter happens
+    separation, time = _closest_approach(times1, positions1, times2, positions2, np.zeros((1, 2)), np.zeros((1, 3)))
+    if np.isnan(separation[0]):
+        closest, nominal_separation = float((start + end) / 2), None
+    else:
+        closest, nominal_separation = float(time[0]), float(separation[0])
+
+    delays = rng.normal(0.0, timing_jitter, size=(samples, 2))
+    drift = rng.normal(0.0, gps_sigma, size=(samples, 2, 3))
+    conflicted = np.zeros(samples, dtype=bool)
+    batch = max(1, batch_size // (len(times1) + len(times2)))
+    for first in range(0, samples, batch):
+        rows = slice(first, first + batch)
+        separations, _ = _closest_approach(times1, positions1, times2, positions2, delays[rows],
+                                           drift[rows, 0] - drift[rows, 1])
+        with np.errstate(invalid='ignore'):
+            conflicted[rows] = separations < safety_buffer
+    probability = float(conflicted.mean())
+
+    position = _sample_positions(times1, positions1, closest)
+    if np.isnan(position).any():
+        position = _sample_positions(times2, positions2, closest)
+    position = tuple(float(v) for v in position)
+    return {
+        'location': f"({position[0]}, {position[1]}, {position[2]})",
+        'time': format_time_range(closest, closest),
+        'involved_flights': [flight1['drone_id'], flight2['drone_id']],
+        'position': position,
+        'interval': (closest, closest),
+        'separation': nominal_separation,
+        'probability': probability,
+        'std_error': float(np.sqrt(probability * (1 - probability) / samples)),
+        'samples': samples
+    }
+
+def estimate_conflict_probabilities(primary_mission, simulated_flights, safety_buffer=2.0, gps_sigma=1.0,
+                                    timing_jitter=60.0, samples=2000, fleet_index=None, seed=None):
+    """
+    Probabilistic conflict check of the primary mission against the fleet.
+
+    Only flights returned by the broad phase are sampled: those with a leg whose
+    bounding box comes within safety_buffer plus four combined GPS standard
+    deviations of a primary leg's bounding box.
+
+    Parameters:
+    gps_sigma (float): Standard deviation of the position error per axis.
+    timing_jitter (float): Standard deviation of schedule slip in seconds.
+    samples (int): Monte Carlo samples per flight pair.
+    fleet_index (FleetIndex): Optional prebuilt index of simulated_flights.
+    seed (int): Seed for reproducible sampling.
+
+    Returns:
+    list: One result per candidate encounter (see pair_conflict_probability),
+          most probable first.
+    """
+    rng = np.random.default_rng(seed)
+    primary = normalize_flight(primary_mission, drone_id='primary')
+    radius = safety_buffer + 4 * np.sqrt(2) * gps_sigma
+    if fleet_index is None:
+        fleet_index = FleetIndex.from_schedule(simulated_flights, cell_size=radius)
+
+    results = []
+    for flight_idx in candidate_flights(primary, fleet_index, radius):
+        result = pair_conflict_probability(primary, fleet_index.flights[flight_idx], safety_buffer, gps_sigma,
+                                           timing_jitter, samples, rng)
+        if result is not None:
+            results.append(result)
+    results.sort(key=lambda result: -result['probability'])
+    return results
@@ -3,7 +3,9 @@ import json
 import os
 from dotenv import load_dotenv
 import time
-from datetime import datetime, timedelta
+import ast
+
+from .time_normalization import normalize_flight, format_iso_timestamp
 
 # Load environment variables
 load_dotenv()
@@ -151,6 +153,12 @@ def parse_coordinates(coord_str):
         return None
     return None
 
+def conflict_position(conflict):
+    """Return the (x, y, z) position of a conflict, parsing its location string if needed."""
+    if conflict.get('position') is not None:
+        return tuple(conflict['position'])
+    return tuple(ast.literal_eval(conflict['location']))  # Convert string "(x, y, z)" to tuple
+
 def create_resolved_mission(primary_mission, solutions):
     """
     Create a new mission file incorporating the LLM's suggested changes.
@@ -165,15 +173,20 @@ def create_resolved_mission(primary_mission, solutions):
     # Create a deep copy of the primary mission
     resolved_mission = json.loads(json.dumps(primary_mission))
     
-    # Sort solutions by timestamp to apply changes in chronological order
-    solutions.sort(key=lambda x: x['conflict'].get('time', ''))
+    # Work on epoch seconds; timestamps are only formatted back when written
+    normalized = normalize_flight(resolved_mission, drone_id='primary')
+    waypoint_times = normalized['times']
+    window_start, window_end = normalized['start'], normalized['end']
+    
+    # Sort solutions by conflict start time to apply changes in chronological order
+    solutions.sort(key=lambda x: x['conflict']['interval'][0] if x['conflict'].get('interval') else float('-inf'))
     
     # Keep track of modified waypoints to avoid double-applying changes
     modified_waypoints = set()
     
     for solution in solutions:
         suggestion = solution['suggestion']
-        conflict_location = eval(solution['conflict']['location'])  # Convert string "(x, y, z)" to tuple
+        conflict_location = conflict_position(solution['conflict'])
         
         # Find ALL waypoints near the conflict that might need adjustment
         affected_waypoints = []
@@ -243,17 +256,16 @@ def create_resolved_mission(primary_mission, solutions):
                     if delay_min < 5:  # Enforce minimum time separation
                         delay_min = 5
                     
-                    # Convert timestamps to datetime, add delay, and convert back to string
-                    timestamp = datetime.fromisoformat(resolved_mission['waypoints'][wp_idx]['timestamp'].replace('Z', ''))
-                    new_timestamp = timestamp + timedelta(minutes=delay_min)
-                    resolved_mission['waypoints'][wp_idx]['timestamp'] = new_timestamp.isoformat() + 'Z'
+                    # Shift the numeric timestamp and format it back to a string
+                    waypoint_times[wp_idx] += delay_min * 60
+                    resolved_mission['waypoints'][wp_idx]['timestamp'] = format_iso_timestamp(waypoint_times[wp_idx])
                     
                     # Update time window only if this is the first delayed waypoint
                     if not modified_waypoints:
-                        start_time = datetime.fromisoformat(resolved_mission['time_window']['start'].replace('Z', ''))
-                        end_time = datetime.fromisoformat(resolved_mission['time_window']['end'].replace('Z', ''))
-                        resolved_mission['time_window']['start'] = (start_time + timedelta(minutes=delay_min)).isoformat() + 'Z'
-                        resolved_mission['time_window']['end'] = (end_time + timedelta(minutes=delay_min)).isoformat() + 'Z'
+                        window_start += delay_min * 60
+                        window_end += delay_min * 60
+                        resolved_mission['time_window']['start'] = format_iso_timestamp(window_start)
+                        resolved_mission['time_window']['end'] = format_iso_timestamp(window_end)
                         print(f"Applied delay of {delay_min} minutes")
                 except ValueError:
                     print(f"Could not parse delay value: {suggestion['delay']}")
@@ -0,0 +1,136 @@
+from collections import Counter
+import heapq
+import json
+import math
+import sys
+
+from .conflict_explanation import explain_conflict
+from .time_normalization import format_time_range
+
+class NDJSONSink:
+    """
+    Write each conflict as one JSON line, with its explanation formatted on the fly.
+
+    Nothing is retained after a conflict is written, so memory stays constant no
+    matter how many conflicts pass through. Use as a context manager to close
+    the file when done.
+    """
+
+    def __init__(self, output='-', explain=True):
+        """
+        Parameters:
+        output (str or file): Path to write to, '-' for stdout, or an open text file.
+        explain (bool): Add an 'explanation' field to every record.
+        """
+        if output == '-':
+            self.file, self._owns_file = sys.stdout, False
+        elif isinstance(output, str):
+            self.file, self._owns_file = open(output, 'w'), True
+        else:
+            self.file, self._owns_file = output, False
+        self.explain = explain
+        self.count = 0
+
+    def write(self, conflict):
+        record = dict(conflict)
+        if self.explain:
+            record['explanation'] = explain_conflict(conflict)
+        self.file.write(json.dumps(record) + '\n')
+        self.count += 1
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.file.flush()
+        if self._owns_file:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class SummarySink:
+    """
+    Aggregate a conflict stream into counts and extremes without keeping the conflicts.
+
+    Memory grows with the number of distinct flight pairs and top_n, not with
+    the number of conflicts.
+    """
+
+    def __init__(self, top_n=10):
+        self.top_n = top_n
+        self.count = 0
+        self.untimed = 0
+        self.pairs = Counter()
+        self.flights = Counter()
+        self.min_separation = math.inf
+        self.first_time = math.inf
+        self.last_time = -math.inf
+        self._closest = []  # Max-heap on separation (negated) of the top_n closest conflicts
+        self._sequence = 0
+
+    def write(self, conflict):
+        self.count += 1
+        flights = conflict['involved_flights']
+        self.pairs[tuple(sorted(flights))] += 1
+        self.flights.update(flights)
+        separation = conflict.get('separation')
+        if separation is not None:
+            self.min_separation = min(self.min_separation, separation)
+            self._sequence += 1
+            entry = (-separation, self._sequence, conflict)
+            if len(self._closest) < self.top_n:
+                heapq.heappush(self._closest, entry)
+            elif entry > self._closest[0]:
+                heapq.heapreplace(self._closest, entry)
+        if conflict.get('interval'):
+            self.first_time = min(self.first_time, conflict['interval'][0])
+            self.last_time = max(self.last_time, conflict['interval'][1])
+        else:
+            self.untimed += 1
+
+    def close(self):
+        pass
+
+    def summary(self):
+        """
+        Returns:
+        dict: 'conflicts', 'untimed', 'pairs', 'min_separation' (None if no conflict
+              carried a separation), 'time' (formatted range of all timed conflicts),
+              'busiest_pairs' and 'busiest_flights' (top_n by conflict count) and
+              'closest' (the top_n closest conflicts).
+        """
+        return {
+            'conflicts': self.count,
+            'untimed': self.untimed,
+            'pairs': len(self.pairs),
+            'min_separation': self.min_separation if math.isfinite(self.min_separation) else None,
+            'time': format_time_range(self.first_time, self.last_time) if self.count > self.untimed else None,
+            'busiest_pairs': self.pairs.most_common(self.top_n),
+            'busiest_flights': self.flights.most_common(self.top_n),
+            'closest': [conflict for _, _, conflict in sorted(self._closest, reverse=True)]
+        }
+
+def stream_conflicts(conflicts, *sinks):
+    """
+    Pass every conflict of an iterable to each sink, one at a time.
+
+    Parameters:
+    conflicts (iterable): Conflicts, typically a lazy generator from the detectors.
+    sinks: Objects with write(conflict) and close() methods; closed when the stream ends.
+
+    Returns:
+    int: Number of conflicts streamed.
+    """
+    count = 0
+    try:
+        for conflict in conflicts:
+            for sink in sinks:
+                sink.write(conflict)
+            count += 1
+    finally:
+        for sink in sinks:
+            sink.close()
+    return count
@@ -0,0 +1,189 @@
+from collections import defaultdict
+from itertools import product
+import math
+
+import numpy as np
+
+from .time_normalization import normalize_flight
+
+class FleetIndex:
+    """
+    Uniform grid index over the waypoints of a fleet of normalized flights.
+
+    Each waypoint is hashed into a cubic cell of side cell_size, so a radius
+    query only inspects the handful of cells around the query point instead
+    of every waypoint of every flight. Flights can be added incrementally.
+    """
+
+    def __init__(self, cell_size=2.0):
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+        self.cell_size = float(cell_size)
+        self.flights = []
+        self._cells = defaultdict(list)  # cell -> [(flight_idx, wp_idx), ...]
+
+    @classmethod
+    def from_flights(cls, normalized_flights, cell_size=2.0):
+        """Build an index from already normalized flights."""
+        index = cls(cell_size)
+        for flight in normalized_flights:
+            index.add_flight(flight)
+        return index
+
+    @classmethod
+    def from_schedule(cls, simulated_flights, cell_size=2.0):
+        """Build an index from a flight schedule ({'flights': [...]})."""
+        return cls.from_flights((normalize_flight(flight) for flight in simulated_flights['flights']), cell_size)
+
+    def __len__(self):
+        return len(self.flights)
+
+    def _cell(self, point):
+        return tuple(int(math.floor(v / self.cell_size)) for v in point)
+
+    def add_flight(self, normalized_flight):
+        """Insert a normalized flight and return its position in self.flights."""
+        flight_idx = len(self.flights)
+        self.flights.append(normalized_flight)
+        for wp_idx, point in enumerate(normalized_flight['positions'].tolist()):
+            self._cells[self._cell(point)].append((flight_idx, wp_idx))
+        return flight_idx
+
+    def query(self, point, radius):
+        """
+        Find indexed waypoints strictly closer than radius to a point.
+
+        Returns:
+        list: (flight_idx, wp_idx, distance) tuples in no particular order.
+        """
+        low = self._cell([v - radius for v in point])
+        high = self._cell([v + radius for v in point])
+        hits = []
+        for cx in range(low[0], high[0] + 1):
+            for cy in range(low[1], high[1] + 1):
+                for cz in range(low[2], high[2] + 1):
+                    for flight_idx, wp_idx in self._cells.get((cx, cy, cz), ()):
+                        distance = math.dist(point, self.flights[flight_idx]['positions'][wp_idx])
+                        if distance < radius:
+                            hits.append((flight_idx, wp_idx, distance))
+        return hits
+
+    def iter_query_flight(self, normalized_flight, radius):
+        """
+        Lazily yield waypoint pairs between a flight and the indexed fleet closer than radius.
+
+        Yields the same tuples as query_flight, one query waypoint at a time and
+        nearest first within each waypoint, so callers can stop at the first hit.
+        """
+        for query_idx, point in enumerate(normalized_flight['positions'].tolist()):
+            for flight_idx, wp_idx, distance in sorted(self.query(point, radius), key=lambda hit: hit[2]):
+                yield query_idx, flight_idx, wp_idx, distance
+
+    def query_flight(self, normalized_flight, radius):
+        """
+        Find all waypoint pairs between a flight and the indexed fleet closer than radius.
+
+        Returns:
+        list: (query_wp_idx, flight_idx, wp_idx, distance) tuples, ordered by
+              indexed flight, then query waypoint, then indexed waypoint.
+        """
+        hits = []
+        for query_idx, point in enumerate(normalized_flight['positions'].tolist()):
+            for flight_idx, wp_idx, distance in self.query(point, radius):
+                hits.append((query_idx, flight_idx, wp_idx, distance))
+        hits.sort(key=lambda hit: (hit[1], hit[0], hit[2]))
+        return hits
+
+def flight_proximity(flight1, flight2):
+    """
+    Cheap lower bounds on how close two normalized flights can get.
+
+    Returns:
+    tuple: (gap between the waypoint bounding boxes, gap between the time windows
+           in seconds), both 0 when they overlap. Sorting pairs by this puts the
+           most likely conflicts first.
+    """
+    low1, high1 = flight1['positions'].min(axis=0), flight1['positions'].max(axis=0)
+    low2, high2 = flight2['positions'].min(axis=0), flight2['positions'].max(axis=0)
+    box_gap = math.sqrt(sum(max(0.0, l2 - h1, l1 - h2) ** 2 for l1, h1, l2, h2 in zip(low1, high1, low2, high2)))
+    time_gap = max(0.0, flight2['start'] - flight1['end'], flight1['start'] - flight2['end'])
+    return box_gap, time_gap
+
+def leg_bounds(positions):
+    """
+    Axis-aligned bounding boxes of the legs of a waypoint path.
+
+    Returns:
+    tuple: (low, high) arrays with one row per leg; a single waypoint is one
+           zero-length leg.
+    """
+    if len(positions) == 1:
+        return positions.copy(), positions.copy()
+    return np.minimum(positions[:-1], positions[1:]), np.maximum(positions[:-1], positions[1:])
+
+def iter_flight_pairs(flights, nearest_first=False):
+    """
+    Yield every (i, j) index pair with i < j of a list of normalized flights.
+
+    Pairs are generated by nested loops, so nothing is materialized up front;
+    only with nearest_first are all pairs collected and sorted by flight_proximity.
+    """
+    if nearest_first:
+        pairs = [(i, j) for i in range(len(flights)) for j in range(i + 1, len(flights))]
+        pairs.sort(key=lambda pair: flight_proximity(flights[pair[0]], flights[pair[1]]))
+        yield from pairs
+        return
+    for i in range(len(flights)):
+        for j in range(i + 1, len(flights)):
+            yield i, j
+
+def find_close_pairs(positions, radius):
+    """
+    Find all pairs of points closer than radius using a vectorized uniform grid.
+
+    Points are bucketed into cells of side radius, so only points in the same or
+    a neighbouring cell are compared. All bucketing and pair generation runs on
+    NumPy arrays, with no Python loop over points.
+
+    Parameters:
+    positions (array): N x 3 array of points.
+    radius (float): Separation threshold.
+
+    Returns:
+    tuple: (first, second, distances) arrays with first < second for every pair.
+    """
+    positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+    empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0))
+    if len(positions) < 2:
+        return empty
+
+    cells = np.floor(positions / radius).astype(np.int64)
+    cells -= cells.min(axis=0) - 1  # Leave room for the -1 neighbour offset
+    dims = cells.max(axis=0) + 2
+    keys = (cells[:, 0] * dims[1] + cells[:, 1]) * dims[2] + cells[:, 2]
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+
+    first_parts, second_parts = [], []
+    for dx, dy, dz in product((-1, 0, 1), repeat=3):
+        neighbour_keys = ((cells[:, 0] + dx) * dims[1] + cells[:, 1] + dy) * dims[2] + cells[:, 2] + dz
+        low = np.searchsorted(sorted_keys, neighbour_keys, side='left')
+        high = np.searchsorted(sorted_keys, neighbour_keys, side='right')
+        counts = high - low
+        if not counts.any():
+            continue
+        # Expand each point into (point, candidate) pairs for its neighbour cell
+        first = np.repeat(np.arange(len(positions)), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        second = order[np.repeat(low, counts) + offsets]
+        mask = first < second
+        first_parts.append(first[mask])
+        second_parts.append(second[mask])
+
+    if not first_parts:
+        return empty
+    first = np.concatenate(first_parts)
+    second = np.concatenate(second_parts)
+    distances = np.sqrt(((positions[first] - positions[second]) ** 2).sum(axis=1))
+    close = distances < radius
+    return first[close], second[close], distances[close]
@@ -0,0 +1,217 @@
+import json
+import math
+
+import numpy as np
+
+from .time_normalization import normalize_flight, parse_timestamp, format_time_range
+
+def _zone_bounds(zone):
+    """3D bounding box (min_x, min_y, min_z, max_x, max_y, max_z) of a zone."""
+    if zone['type'] == 'cylinder':
+        cx, cy = zone['center']
+        r = zone['radius']
+        return (cx - r, cy - r, zone['floor'], cx + r, cy + r, zone['ceiling'])
+    vertices = np.asarray(zone['vertices'], dtype=float)
+    low, high = vertices.min(axis=0), vertices.max(axis=0)
+    return (low[0], low[1], zone['floor'], high[0], high[1], zone['ceiling'])
+
+def prepare_zone(zone):
+    """
+    Validate a zone definition and convert its active window to epoch seconds.
+
+    Zones are cylinders ({'type': 'cylinder', 'center': [x, y], 'radius': r}) or
+    polygons ({'type': 'polygon', 'vertices': [[x, y], ...]}), each with a 'zone_id',
+    an altitude band 'floor'/'ceiling' and an optional 'active' time window
+    {'start': ..., 'end': ...}; zones without one are always active.
+    """
+    if zone.get('type') not in ('cylinder', 'polygon'):
+        raise ValueError(f"Unknown geofence type for zone {zone.get('zone_id')}: {zone.get('type')}")
+    if zone['type'] == 'polygon' and len(zone['vertices']) < 3:
+        raise ValueError(f"Polygon zone {zone['zone_id']} needs at least 3 vertices")
+    prepared = dict(zone)
+    prepared.setdefault('floor', -math.inf)
+    prepared.setdefault('ceiling', math.inf)
+    if zone.get('active'):
+        prepared['active_start'] = parse_timestamp(zone['active']['start'])
+        prepared['active_end'] = parse_timestamp(zone['active']['end'])
+    else:
+        prepared['active_start'], prepared['active_end'] = -math.inf, math.inf
+    return prepared
+
+class GeofenceIndex:
+    """
+    Static R-tree over no-fly zones, bulk loaded with Sort-Tile-Recursive packing.
+
+    Zones are sorted into tiles by x then y and packed node_capacity to a node,
+    so node k of each level covers a contiguous block of the level below. A
+    query walks the levels top-down, testing all surviving nodes of a level in
+    one vectorized box-overlap check.
+    """
+
+    def __init__(self, zones, node_capacity=16):
+        self.node_capacity = node_capacity
+        zones = [prepare_zone(zone) for zone in zones]
+        if not zones:
+            self.zones, self.levels = [], []
+            return
+
+        bounds = np.array([_zone_bounds(zone) for zone in zones], dtype=float)
+        centers = (bounds[:, :2] + bounds[:, 3:5]) / 2
+        slice_count = max(1, math.ceil(math.sqrt(len(zones) / node_capacity)))
+        slice_size = slice_count * node_capacity
+        by_x = np.argsort(centers[:, 0], kind='stable')
+        order = np.concatenate([
+            block[np.argsort(centers[block, 1], kind='stable')]
+            for block in (by_x[i:i + slice_size] for i in range(0, len(zones), slice_size))
+        ])
+        self.zones = [zones[idx] for idx in order]
+
+        # levels[0] holds the zone boxes, each higher level the boxes of the nodes below
+        self.levels = [bounds[order]]
+        while len(self.levels[-1]) > node_capacity:
+            below = self.levels[-1]
+            starts = np.arange(0, len(below), node_capacity)
+            self.levels.append(np.hstack([np.minimum.reduceat(below[:, :3], starts),
+                                          np.maximum.reduceat(below[:, 3:], starts)]))
+
+    @classmethod
+    def from_file(cls, path, node_capacity=16):
+        """Load zones from a JSON file of the form {'zones': [...]}."""
+        with open(path, 'r') as file:
+            return cls(json.load(file)['zones'], node_capacity)
+
+    def __len__(self):
+        return len(self.zones)
+
+    def query(self, low, high):
+        """Return the zones whose bounding boxes overlap the box [low, high]."""
+        if not self.levels:
+            return []
+        low = np.asarray(low, dtype=float)
+        high = np.asarray(high, dtype=float)
+        candidates = np.arange(len(self.levels[-1]))
+        for depth in range(len(self.levels) - 1, -1, -1):
+            boxes = self.levels[depth][candidates]
+            overlapping = candidates[((boxes[:, :3] <= high) & (boxes[:, 3:] >= low)).all(axis=1)]
+            if depth == 0:
+                return [self.zones[idx] for idx in overlapping]
+            # Expand surviving nodes into their contiguous block of children
+            children = (overlapping[:, None] * self.node_capacity + np.arange(self.node_capacity)).ravel()
+            candidates = children[children < len(self.levels[depth - 1])]
+        return []
+
+def _clip_interval(values0, values1, low, high):
+    """Parameter range [s0, s1] within [0, 1] where a linear value stays inside [low, high]."""
+    if values0 == values1:
+        return (0.0, 1.0) if low <= values0 <= high else None
+    s_low = (low - values0) / (values1 - values0)
+    s_high = (high - values0) / (values1 - values0)
+    s0, s1 = max(0.0, min(s_low, s_high)), min(1.0, max(s_low, s_high))
+    return (s0, s1) if s0 <= s1 else None
+
+def _point_in_polygon(point, vertices):
+    """Even-odd ray casting test."""
+    x, y = point
+    inside = False
+    for (x1, y1), (x2, y2) in zip(vertices, vertices[1:] + vertices[:1]):
+        if (y1 > y) != (y2 > y) and x < (x2 - x1) * (y - y1) / (y2 - y1) + x1:
+            inside = not inside
+    return inside
+
+def _segment_entry(start, end, zone):
+    """
+    Fraction along the 2D segment start->end where it first enters the zone footprint, or None.
+    """
+    dx, dy = end[0] - start[0], end[1] - start[1]
+    if zone['type'] == 'cylinder':
+        cx, cy = zone['center']
+        fx, fy = start[0] - cx, start[1] - cy
+        c = fx * fx + fy * fy - zone['radius'] ** 2
+        if c <= 0:
+            return 0.0
+        a = dx * dx + dy * dy
+        b = 2 * (fx * dx + fy * dy)
+        discriminant = b * b - 4 * a * c
+        if a == 0 or discriminant < 0:
+            return None
+        entry = (-b - math.sqrt(discriminant)) / (2 * a)
+        return entry if 0.0 <= entry <= 1.0 else None
+
+    vertices = [tuple(v) for v in zone['vertices']]
+    if _point_in_polygon(start, vertices):
+        return 0.0
+    entries = []
+    for (x1, y1), (x2, y2) in zip(vertices, vertices[1:] + vertices[:1]):
+        ex, ey = x2 - x1, y2 - y1
+        denominator = dx * ey - dy * ex
+        if denominator == 0:
+            continue  # Parallel edge
+        s = ((x1 - start[0]) * ey - (y1 - start[1]) * ex) / denominator
+        u = ((x1 - start[0]) * dy - (y1 - start[1]) * dx) / denominator
+        if 0.0 <= s <= 1.0 and 0.0 <= u <= 1.0:
+            entries.append(s)
+    return min(entries) if entries else None
+
+def check_geofence_violations(mission, geofence_index, drone_id='primary'):
+    """
+    Check every leg of a mission against the no-fly zones near it.
+
+    Each leg's bounding box is looked up in the R-tree, and only the returned
+    zones get the exact test: the part of the leg inside the zone's altitude
+    band and active window is clipped out and intersected with the footprint.
+    Legs with unknown times are checked against zones regardless of their
+    active windows.
+
+    Returns:
+    list: Violations in the conflict format ('location', 'time', 'involved_flights'
+          as [drone_id, zone_id], 'position', 'interval', 'separation' of 0), plus
+          'zone_id', reporting where the mission first enters each zone.
+    """
+    flight = normalize_flight(mission, drone_id=drone_id)
+    positions, times = flight['positions'], flight['times']
+    if len(positions) == 1:
+        positions = np.vstack([positions, positions])
+        times = np.concatenate([times, times])
+
+    violations = []
+    reported = set()
+    for leg in range(len(positions) - 1):
+        p0, p1 = positions[leg], positions[leg + 1]
+        t0, t1 = times[leg], times[leg + 1]
+        for zone in geofence_index.query(np.minimum(p0, p1), np.maximum(p0, p1)):
+            if zone['zone_id'] in reported:
+                continue
+            # Part of the leg inside the altitude band and, if timed, the active window
+            window = _clip_interval(p0[2], p1[2], zone['floor'], zone['ceiling'])
+            if window is not None and not (math.isnan(t0) or math.isnan(t1)):
+                active = _clip_interval(t0, t1, zone['active_start'], zone['active_end'])
+                if active is None or max(window[0], active[0]) > min(window[1], active[1]):
+                    window = None
+                else:
+                    window = (max(window[0], active[0]), min(window[1], active[1]))
+            if window is None:
+                continue
+
+            start = p0 + (p1 - p0) * window[0]
+            end = p0 + (p1 - p0) * window[1]
+            entry = _segment_entry(start[:2], end[:2], zone)
+            if entry is None:
+                continue
+
+            fraction = window[0] + (window[1] - window[0]) * entry
+            position = tuple(float(v) for v in p0 + (p1 - p0) * fraction)
+            interval = None
+            if not (math.isnan(t0) or math.isnan(t1)):
+                entry_time = float(t0 + (t1 - t0) * fraction)
+                interval = (entry_time, entry_time)
+            reported.add(zone['zone_id'])
+            violations.append({
+                'location': f"({position[0]}, {position[1]}, {position[2]})",
+                'time': format_time_range(*interval) if interval else None,
+                'involved_flights': [drone_id, zone['zone_id']],
+                'position': position,
+                'interval': interval,
+                'separation': 0.0,
+                'zone_id': zone['zone_id']
+            })
+    return violations
@@ -0,0 +1,209 @@
+from collections import Counter
+from itertools import product
+
+import numpy as np
+
+from .time_normalization import normalize_flight
+
+class OccupancyGrid:
+    """
+    Sparse 4D occupancy counts over (x, y, z, time bucket) cells.
+
+    Every flight is rasterized once into the set of cells its legs pass through,
+    and each cell counts how many flights occupy it. Flights can be added and
+    removed incrementally, and capacity, slot and density questions become
+    dictionary lookups instead of pairwise conflict checks. A second count per
+    (x, y, z) column, over all time buckets, backs provably_clear.
+    """
+
+    def __init__(self, cell_size=10.0, altitude_step=10.0, time_bucket=60.0):
+        self.cell_size = float(cell_size)
+        self.altitude_step = float(altitude_step)
+        self.time_bucket = float(time_bucket)
+        self.counts = Counter()  # (ix, iy, iz, it) -> number of flights
+        self.columns = Counter()  # (ix, iy, iz) -> number of flights, at any time
+        self._flight_cells = {}  # drone_id -> (cells, columns) of that flight
+
+    @classmethod
+    def from_schedule(cls, simulated_flights, **grid_options):
+        """Build a grid from a flight schedule ({'flights': [...]})."""
+        grid = cls(**grid_options)
+        for flight in simulated_flights['flights']:
+            grid.add_flight(normalize_flight(flight))
+        return grid
+
+    def __len__(self):
+        return len(self._flight_cells)
+
+    def rasterize(self, normalized_flight):
+        """
+        Return the unique cells (K x 4 integer array) a normalized flight passes through.
+
+        Legs are sampled in one vectorized pass, finely enough that no sample
+        skips a cell in space or a bucket in time. Waypoints without times are
+        spread evenly over the flight's time window.
+        """
+        positions = normalized_flight['positions']
+        times = normalized_flight['times']
+        if np.isnan(times).any():
+            times = np.linspace(normalized_flight['start'], normalized_flight['end'], len(positions))
+        if len(positions) == 1:
+            samples, sample_times = positions, times
+        else:
+            legs = np.diff(positions, axis=0)
+            durations = np.abs(np.diff(times))
+            spans = np.maximum.reduce([np.abs(legs[:, :2]).max(axis=1) / self.cell_size,
+                                       np.abs(legs[:, 2]) / self.altitude_step,
+                                       durations / self.time_bucket])
+            steps = np.ceil(spans * 2).astype(np.int64) + 1
+            leg_ids = np.repeat(np.arange(len(legs)), steps)
+            fractions = (np.arange(steps.sum()) - np.repeat(np.cumsum(steps) - steps, steps)) / np.repeat(steps, steps)
+            samples = np.vstack([positions[leg_ids] + legs[leg_ids] * fractions[:, None], positions[-1:]])
+            sample_times = np.append(times[leg_ids] + np.diff(times)[leg_ids] * fractions, times[-1])
+
+        cells = np.column_stack([
+            np.floor(samples[:, 0] / self.cell_size),
+            np.floor(samples[:, 1] / self.cell_size),
+            np.floor(samples[:, 2] / self.altitude_step),
+            np.floor(sample_times / self.time_bucket)
+        ]).astype(np.int64)
+        return np.unique(cells, axis=0)
+
+    def add_flight(self, normalized_flight):
+        """Insert a normalized flight, replacing any earlier flight with the same drone_id."""
+        drone_id = normalized_flight['drone_id']
+        self.remove_flight(drone_id)
+        raster = self.rasterize(normalized_flight)
+        cells = [tuple(cell) for cell in raster.tolist()]
+        columns = [tuple(column) for column in np.unique(raster[:, :3], axis=0).tolist()]
+        self.counts.update(cells)
+        self.columns.update(columns)
+        self._flight_cells[drone_id] = (cells, columns)
+
+    def remove_flight(self, drone_id):
+        """Remove a flight's occupancy; unknown ids are ignored."""
+        entry = self._flight_cells.pop(drone_id, None)
+        if entry is None:
+            return
+        for counter, keys in zip((self.counts, self.columns), entry):
+            counter.subtract(keys)
+            for key in keys:
+                if counter[key] <= 0:
+                    del counter[key]
+
+    @staticmethod
+    def _dilate(cells):
+        """Add the 26 spatial neighbours (same time bucket) of every cell."""
+        offsets = np.array([(dx, dy, dz, 0) for dx, dy, dz in product((-1, 0, 1), repeat=3)])
+        return np.unique((cells[:, None, :] + offsets[None, :, :]).reshape(-1, 4), axis=0)
+
+    def _occupied(self, cells, dilate):
+        """Number of flights counted in the given cells, optionally including their spatial neighbours."""
+        if dilate:
+            cells = self._dilate(cells)
+        counts = self.counts
+        return sum(counts.get(cell, 0) for cell in map(tuple, cells.tolist()))
+
+    def occupancy(self, mission, dilate=True):
+        """
+        Count existing occupancy along a mission's path.
+
+        With dilate=True the neighbouring cells in space are included, so traffic
+        just across a cell boundary is not missed.
+        """
+        return self._occupied(self.rasterize(normalize_flight(mission, drone_id='primary')), dilate)
+
+    def is_free(self, mission, dilate=True):
+        """
+        True if no other flight occupies the cells along the mission's path in the same time buckets.
+
+        This is a capacity question at cell resolution, not a conflict check:
+        traffic in the same cell may still be further apart than any safety buffer.
+        """
+        return self.occupancy(mission, dilate) == 0
+
+    def provably_clear(self, mission, distance):
+        """
+        Conservative screen: True only if no flight in the grid comes within distance of the mission.
+
+        The mission's cells and their spatial neighbours are looked up in the
+        per-column counts, ignoring time, because the spatial conflict check
+        flags close waypoints at any time. Any point within distance of the
+        mission lies in a neighbouring cell as long as distance does not exceed
+        the cell size, so True means the full check would find nothing; False
+        only means the full check is needed.
+        """
+        if distance > min(self.cell_size, self.altitude_step):
+            raise ValueError(f"Distance {distance} is larger than the grid's cells and cannot be screened")
+        columns = np.unique(self.rasterize(normalize_flight(mission, drone_id='primary'))[:, :3], axis=0)
+        offsets = np.array(list(product((-1, 0, 1), repeat=3)))
+        neighbours = np.unique((columns[:, None, :] + offsets[None, :, :]).reshape(-1, 3), axis=0)
+        return not any(column in self.columns for column in map(tuple, neighbours.tolist()))
+
+    def free_slots(self, mission, earliest, latest, time_step=None, altitude_offsets=(0.0,), dilate=True):
+        """
+        Find launch times (and altitude offsets) at which a mission's corridor is free.
+
+        The mission is rasterized once; each candidate is the same cell set shifted
+        by whole time buckets and altitude steps, so no candidate is re-rasterized.
+
+        Parameters:
+        mission (dict): Mission whose path defines the corridor.
+        earliest, latest (float): Range of launch times to try, in epoch seconds.
+        time_step (float): Spacing of candidate launch times; defaults to the time bucket.
+        altitude_offsets (tuple): Altitude changes to try, rounded to whole altitude steps.
+
+        Returns:
+        list: (launch_time, altitude_offset) pairs with no occupancy, earliest first.
+        """
+        normalized = normalize_flight(mission, drone_id='primary')
+        cells = self.rasterize(normalized)
+        if dilate:
+            cells = self._dilate(cells)
+        first_time = np.nanmin(normalized['times']) if not np.isnan(normalized['times']).all() else normalized['start']
+        time_step = self.time_bucket if time_step is None else time_step
+
+        slots = []
+        for launch_time in np.arange(earliest, latest + 1e-9, time_step):
+            bucket_shift = int(round((launch_time - first_time) / self.time_bucket))
+            for altitude_offset in altitude_offsets:
+                level_shift = int(round(altitude_offset / self.altitude_step))
+                shifted = cells + np.array([0, 0, level_shift, bucket_shift])
+                if self._occupied(shifted, False) == 0:
+                    slots.append((float(launch_time), float(altitude_offset)))
+        return slots
+
+    def density(self, start=None, end=None, low=None, high=None):
+        """
+        2D heatmap of occupancy summed over altitude and the time range [start, end).
+
+        Parameters:
+        start, end (float): Optional time range in epoch seconds.
+        low, high (tuple): Optional (x, y) corners of the area of interest.
+
+        Returns:
+        tuple: (heatmap, origin) where heatmap[i, j] counts flight-cells in grid
+               column (origin[0] + i, origin[1] + j) and origin is in cell units.
+        """
+        if not self.counts:
+            return np.zeros((0, 0), dtype=np.int64), (0, 0)
+        cells = np.array(list(self.counts.keys()), dtype=np.int64)
+        counts = np.array(list(self.counts.values()), dtype=np.int64)
+        keep = np.ones(len(cells), dtype=bool)
+        if start is not None:
+            keep &= cells[:, 3] >= np.floor(start / self.time_bucket)
+        if end is not None:
+            keep &= cells[:, 3] < np.ceil(end / self.time_bucket)
+        if low is not None:
+            keep &= (cells[:, :2] >= np.floor(np.asarray(low) / self.cell_size)).all(axis=1)
+        if high is not None:
+            keep &= (cells[:, :2] <= np.floor(np.asarray(high) / self.cell_size)).all(axis=1)
+        cells, counts = cells[keep], counts[keep]
+        if not len(cells):
+            return np.zeros((0, 0), dtype=np.int64), (0, 0)
+
+        origin = cells[:, :2].min(axis=0)
+        shape = cells[:, :2].max(axis=0) - origin + 1
+        heatmap = np.zeros(shape, dtype=np.int64)
+        np.add.at(heatmap, (cells[:, 0] - origin[0], cells[:, 1] - origin[1]), counts)
+        return heatmap, (int(origin[0]), int(origin[1]))
@@ -1,6 +1,10 @@
-from datetime import datetime, timedelta
+import numpy as np
 
-def check_spatial_conflict(primary_mission, simulated_flights, safety_buffer=2.0):
+from .time_normalization import normalize_flight, normalize_schedule, format_time_range
+from .fleet_index import FleetIndex, iter_flight_pairs
+
+def check_spatial_conflict(primary_mission, simulated_flights, safety_buffer=2.0, normalized=None,
+                           mode='audit', fleet_index=None):
     """
     Check for spatial conflicts between the primary drone mission and simulated flights.
 
@@ -8,6 +12,10 @@ def check_spatial_conflict(primary_mission, simulated_flights, safety_buffer=2.0
     - primary_mission: A dictionary containing the primary drone's waypoints and time window.
     - simulated_flights: A list of dictionaries, each representing a simulated drone's waypoints and time window.
     - safety_buffer: Minimum distance threshold to consider for conflict detection.
+    - normalized: Optional output of normalize_schedule for the same inputs, to avoid re-parsing times.
+    - mode: 'audit' checks every pair of flights, including simulated-vs-simulated pairs.
+            'query' checks only the primary mission against the indexed fleet.
+    - fleet_index: Optional FleetIndex of the simulated flights, reused across queries.
 
     Returns:
     - conflicts: A list of conflicts detected, each represented as a dictionary with details.
@@ -15,55 +23,75 @@ def check_spatial_conflict(primary_mission, simulated_flights, safety_buffer=2.0
     conflicts = []
     print(f"Checking spatial conflicts with safety buffer: {safety_buffer}")
 
-    # Combine primary mission and simulated flights for all-pairs checking
-    all_flights = [{'drone_id': 'primary', 'waypoints': primary_mission['waypoints'],
-                   'time_window': primary_mission['time_window']}] + simulated_flights['flights']
-    
-    # Check conflicts between all pairs of flights
-    for i in range(len(all_flights)):
-        for j in range(i + 1, len(all_flights)):  # Start from i+1 to avoid checking same pair twice
+    for conflict in iter_spatial_conflicts(primary_mission, simulated_flights, safety_buffer, normalized,
+                                           mode, fleet_index):
+        print(f"Found conflict: {conflict}")
+        conflicts.append(conflict)
+
+    print(f"Total conflicts found: {len(conflicts)}")
+    return conflicts
+
+def iter_spatial_conflicts(primary_mission, simulated_flights, safety_buffer=2.0, normalized=None,
+                           mode='audit', fleet_index=None, nearest_first=False):
+    """
+    Lazily yield spatial conflicts; takes the same parameters as check_spatial_conflict.
+
+    Parameters:
+    - nearest_first: Visit the most likely conflicts first. In 'audit' mode flight pairs
+                     are ordered by bounding-box and time-window gap and waypoint pairs by
+                     distance; in 'query' mode the primary waypoints are queried one at a
+                     time, nearest hit first, without collecting all hits up front.
+    """
+    if mode == 'query':
+        primary = normalized[0] if normalized is not None else normalize_flight(primary_mission, drone_id='primary')
+        if fleet_index is None:
+            fleet_index = FleetIndex.from_schedule(simulated_flights, cell_size=safety_buffer)
+        
+        if nearest_first:
+            hits = fleet_index.iter_query_flight(primary, safety_buffer)
+        else:
+            hits = fleet_index.query_flight(primary, safety_buffer)
+        for idx1, flight_idx, idx2, distance in hits:
+            yield _build_conflict(primary, idx1, fleet_index.flights[flight_idx], idx2, distance)
+    elif mode == 'audit':
+        # Combine primary mission and simulated flights for all-pairs checking
+        all_flights = normalized if normalized is not None else normalize_schedule(primary_mission, simulated_flights)
+        
+        # Check conflicts between all pairs of flights, starting from i+1 to avoid checking same pair twice
+        for i, j in iter_flight_pairs(all_flights, nearest_first):
             flight1 = all_flights[i]
             flight2 = all_flights[j]
             
-            print(f"Checking between {flight1['drone_id']} and {flight2['drone_id']}")
+            # Distances between every pair of waypoints, using full 3D coordinates
+            deltas = flight1['positions'][:, None, :] - flight2['positions'][None, :, :]
+            distances = np.sqrt((deltas ** 2).sum(axis=2))
             
-            # Check for intersection between waypoints
-            for wp1 in flight1['waypoints']:
-                for wp2 in flight2['waypoints']:
-                    # Use full 3D coordinates for conflict detection
-                    point1 = (wp1['x'], wp1['y'], wp1.get('z', 0))
-                    point2 = (wp2['x'], wp2['y'], wp2.get('z', 0))
-                    distance = calculate_distance(point1, point2)
-                    print(f"Distance between {point1} and {point2}: {distance}")
-                    
-                    if distance < safety_buffer:
-                        # Calculate the time of conflict based on waypoint timestamps
-                        time1 = wp1.get('time', None)
-                        time2 = wp2.get('time', None)
-                        
-                        if time1 is not None and time2 is not None:
-                            # Get the time windows for both flights
-                            flight1_start = datetime.fromisoformat(flight1['time_window']['start']).replace(tzinfo=None)
-                            flight2_start = datetime.fromisoformat(flight2['time_window']['start']).replace(tzinfo=None)
-                            
-                            # Calculate actual timestamps for the conflict
-                            conflict_time1 = flight1_start + timedelta(minutes=time1*10)  # Assuming time units are in 10-minute intervals
-                            conflict_time2 = flight2_start + timedelta(minutes=time2*10)
-                            
-                            conflict_time = f"{min(conflict_time1, conflict_time2)} to {max(conflict_time1, conflict_time2)}"
-                        else:
-                            conflict_time = None
-                            
-                        conflict = {
-                            'location': f"({wp1['x']}, {wp1['y']}, {wp1.get('z', 0)})",
-                            'time': conflict_time,
-                            'involved_flights': [flight1['drone_id'], flight2['drone_id']]
-                        }
-                        print(f"Found conflict: {conflict}")
-                        conflicts.append(conflict)
+            hits = np.argwhere(distances < safety_buffer)
+            if nearest_first:
+                hits = hits[np.argsort(distances[hits[:, 0], hits[:, 1]], kind='stable')]
+            for idx1, idx2 in hits:
+                yield _build_conflict(flight1, idx1, flight2, idx2, distances[idx1, idx2])
+    else:
+        raise ValueError(f"Unknown conflict check mode: {mode}")
 
-    print(f"Total conflicts found: {len(conflicts)}")
-    return conflicts
+def _build_conflict(flight1, idx1, flight2, idx2, distance):
+    """Build the conflict record for waypoint idx1 of flight1 against waypoint idx2 of flight2."""
+    wp1 = flight1['waypoints'][idx1]
+    # Waypoint times are already on the common epoch-seconds base
+    time1 = flight1['times'][idx1]
+    time2 = flight2['times'][idx2]
+    interval = None
+    if not (np.isnan(time1) or np.isnan(time2)):
+        interval = (float(min(time1, time2)), float(max(time1, time2)))
+        
+    return {
+        'location': f"({wp1['x']}, {wp1['y']}, {wp1.get('z', 0)})",
+        'time': format_time_range(*interval) if interval else None,
+        'involved_flights': [flight1['drone_id'], flight2['drone_id']],
+        'position': tuple(float(v) for v in flight1['positions'][idx1]),
+        'interval': interval,
+        'separation': float(distance)
+    }
 
 def calculate_distance(point1, point2):
     """
@@ -81,4 +109,4 @@ def calculate_distance(point1, point2):
     elif len(point1) == 3 and len(point2) == 3:  # 3D points
         return ((point1[0] - point2[0]) ** 2 + (point1[1] - point2[1]) ** 2 + (point1[2] - point2[2]) ** 2) ** 0.5
     else:
-        raise ValueError("Points must be 2D or 3D")
\ No newline at end of file
+        raise ValueError("Points must be 2D or 3D")
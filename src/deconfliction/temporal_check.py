@@ -1,45 +1,67 @@
-from datetime import datetime
 import numpy as np
 
-def check_temporal_conflict(primary_mission, simulated_flights, safety_buffer=1.0):
-    conflicts = []
+from .time_normalization import normalize_flight, normalize_schedule, format_time_range
+from .fleet_index import FleetIndex, iter_flight_pairs
 
-    # Combine primary mission and simulated flights for all-pairs checking
-    all_flights = [
-        {
-            'drone_id': 'primary',
-            'waypoints': primary_mission['waypoints'],
-            'time_window': primary_mission['time_window']
-        }
-    ] + simulated_flights['flights']
-    
-    # Check conflicts between all pairs of flights
-    for i in range(len(all_flights)):
-        for j in range(i + 1, len(all_flights)):  # Start from i+1 to avoid checking same pair twice
+def check_temporal_conflict(primary_mission, simulated_flights, safety_buffer=1.0, normalized=None,
+                            mode='audit', fleet_index=None):
+    return list(iter_temporal_conflicts(primary_mission, simulated_flights, safety_buffer, normalized,
+                                        mode, fleet_index))
+
+def iter_temporal_conflicts(primary_mission, simulated_flights, safety_buffer=1.0, normalized=None,
+                            mode='audit', fleet_index=None, nearest_first=False):
+    """
+    Lazily yield temporal conflicts; takes the same parameters as check_temporal_conflict.
+
+    With nearest_first, flight pairs (audit mode) or primary waypoint hits (query mode)
+    are visited nearest first, as in iter_spatial_conflicts.
+    """
+    if mode == 'query':
+        # Only the primary mission against the indexed fleet
+        primary = normalized[0] if normalized is not None else normalize_flight(primary_mission, drone_id='primary')
+        if fleet_index is None:
+            fleet_index = FleetIndex.from_schedule(simulated_flights, cell_size=safety_buffer)
+        
+        if nearest_first:
+            hits = fleet_index.iter_query_flight(primary, safety_buffer)
+        else:
+            hits = fleet_index.query_flight(primary, safety_buffer)
+        for idx1, flight_idx, _, distance in hits:
+            flight = fleet_index.flights[flight_idx]
+            if primary['start'] < flight['end'] and primary['end'] > flight['start']:
+                yield _build_conflict(primary, idx1, flight, distance)
+    elif mode == 'audit':
+        # Combine primary mission and simulated flights for all-pairs checking
+        all_flights = normalized if normalized is not None else normalize_schedule(primary_mission, simulated_flights)
+        
+        # Check conflicts between all pairs of flights, starting from i+1 to avoid checking same pair twice
+        for i, j in iter_flight_pairs(all_flights, nearest_first):
             flight1 = all_flights[i]
             flight2 = all_flights[j]
-            
-            # Convert time windows to datetime objects
-            flight1_start = datetime.fromisoformat(flight1['time_window']['start']).replace(tzinfo=None)
-            flight1_end = datetime.fromisoformat(flight1['time_window']['end']).replace(tzinfo=None)
-            flight2_start = datetime.fromisoformat(flight2['time_window']['start']).replace(tzinfo=None)
-            flight2_end = datetime.fromisoformat(flight2['time_window']['end']).replace(tzinfo=None)
 
-            # Check for time overlap
-            if (flight1_start < flight2_end and flight1_end > flight2_start):
+            # Check for time overlap, time windows are already epoch seconds
+            if (flight1['start'] < flight2['end'] and flight1['end'] > flight2['start']):
                 # Check for spatial conflict during the overlapping time
-                for wp1 in flight1['waypoints']:
-                    for wp2 in flight2['waypoints']:
-                        # Calculate 3D distance between waypoints
-                        distance = np.sqrt((wp1['x'] - wp2['x'])**2 + 
-                                        (wp1['y'] - wp2['y'])**2 +
-                                        (wp1.get('z', 0) - wp2.get('z', 0))**2)
-                        
-                        if distance < safety_buffer:
-                            conflicts.append({
-                                'location': f"({wp1['x']}, {wp1['y']}, {wp1.get('z', 0)})",
-                                'time': f"{max(flight1_start, flight2_start)} to {min(flight1_end, flight2_end)}",
-                                'involved_flights': [flight1['drone_id'], flight2['drone_id']]
-                            })
+                deltas = flight1['positions'][:, None, :] - flight2['positions'][None, :, :]
+                distances = np.sqrt((deltas ** 2).sum(axis=2))
+                
+                hits = np.argwhere(distances < safety_buffer)
+                if nearest_first:
+                    hits = hits[np.argsort(distances[hits[:, 0], hits[:, 1]], kind='stable')]
+                for idx1, idx2 in hits:
+                    yield _build_conflict(flight1, idx1, flight2, distances[idx1, idx2])
+    else:
+        raise ValueError(f"Unknown conflict check mode: {mode}")
 
-    return conflicts
\ No newline at end of file
+def _build_conflict(flight1, idx1, flight2, distance):
+    """Build the conflict record for waypoint idx1 of flight1 during the overlap with flight2."""
+    wp1 = flight1['waypoints'][idx1]
+    interval = (max(flight1['start'], flight2['start']), min(flight1['end'], flight2['end']))
+    return {
+        'location': f"({wp1['x']}, {wp1['y']}, {wp1.get('z', 0)})",
+        'time': format_time_range(*interval),
+        'involved_flights': [flight1['drone_id'], flight2['drone_id']],
+        'position': tuple(float(v) for v in flight1['positions'][idx1]),
+        'interval': interval,
+        'separation': float(distance)
+    }
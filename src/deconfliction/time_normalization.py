@@ -0,0 +1,92 @@
+from datetime import datetime, timezone
+from functools import lru_cache
+import math
+
+import numpy as np
+
+# Simulated flights express waypoint times in relative units of 10 minutes
+RELATIVE_TIME_UNIT = 600.0
+
+
+@lru_cache(maxsize=4096)
+def parse_timestamp(value):
+    """
+    Convert an ISO 8601 timestamp string to float epoch seconds.
+
+    Naive timestamps are treated as UTC. Results are memoized, so repeated
+    strings (time windows shared by many waypoints) are only parsed once.
+    """
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def format_timestamp(seconds):
+    """Format epoch seconds the way conflict reports display times, e.g. '2023-10-01 10:05:00'."""
+    return str(datetime.fromtimestamp(seconds, timezone.utc).replace(tzinfo=None))
+
+
+def format_iso_timestamp(seconds):
+    """Format epoch seconds as a mission file timestamp, e.g. '2023-10-01T10:05:00Z'."""
+    return datetime.fromtimestamp(seconds, timezone.utc).replace(tzinfo=None).isoformat() + 'Z'
+
+
+def format_time_range(start, end):
+    """Format a conflict time range, or return None if either bound is unknown."""
+    if start is None or end is None or math.isnan(start) or math.isnan(end):
+        return None
+    return f"{format_timestamp(start)} to {format_timestamp(end)}"
+
+
+def normalize_flight(flight, drone_id=None):
+    """
+    Convert a mission or simulated flight to numeric arrays on a common time base.
+
+    Waypoints may carry an absolute ISO 'timestamp' (primary missions) or a
+    relative 'time' in RELATIVE_TIME_UNIT steps from the start of the flight's
+    time window (simulated flights). Both are converted to epoch seconds.
+
+    Parameters:
+    flight (dict): Flight with 'waypoints' and 'time_window', optionally 'drone_id'.
+    drone_id (str): Identifier to use instead of flight['drone_id'].
+
+    Returns:
+    dict: 'drone_id', 'waypoints' (the original waypoint dicts), 'positions'
+          (N x 3 array), 'times' (length N array, NaN where unknown), and the
+          time window bounds 'start' and 'end' as epoch seconds.
+    """
+    waypoints = flight['waypoints']
+    start = parse_timestamp(flight['time_window']['start'])
+    end = parse_timestamp(flight['time_window']['end'])
+
+    positions = np.array([(wp['x'], wp['y'], wp.get('z', 0)) for wp in waypoints], dtype=float).reshape(-1, 3)
+    times = np.full(len(waypoints), np.nan)
+    for idx, wp in enumerate(waypoints):
+        if 'timestamp' in wp:
+            times[idx] = parse_timestamp(wp['timestamp'])
+        elif wp.get('time') is not None:
+            times[idx] = start + wp['time'] * RELATIVE_TIME_UNIT
+
+    return {
+        'drone_id': drone_id if drone_id is not None else flight['drone_id'],
+        'waypoints': waypoints,
+        'positions': positions,
+        'times': times,
+        'start': start,
+        'end': end
+    }
+
+
+def normalize_schedule(primary_mission, simulated_flights):
+    """
+    Normalize the primary mission and all simulated flights in one pass.
+
+    Returns:
+    list: Normalized flights, with the primary mission first under drone_id 'primary'.
+    """
+    normalized = [normalize_flight(primary_mission, drone_id='primary')]
+    normalized.extend(normalize_flight(flight) for flight in simulated_flights['flights'])
+    return normalized
@@ -5,6 +5,7 @@ import os
 from deconfliction.spatial_check import check_spatial_conflict
 from deconfliction.temporal_check import check_temporal_conflict
 from deconfliction.conflict_explanation import explain_conflicts
+from deconfliction.geofence import GeofenceIndex, check_geofence_violations
 from simulation.simulator import run_simulation
 from simulation.visualization import plot_missions, animate_conflicts
 
@@ -22,13 +23,29 @@ def load_flight_schedules(file_path):
     with open(absolute_path, 'r') as file:
         return json.load(file)
 
+def load_geofences(file_path):
+    # Geofences are optional, return None if the file is missing
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    absolute_path = os.path.join(base_dir, file_path)
+    if not os.path.exists(absolute_path):
+        return None
+    return GeofenceIndex.from_file(absolute_path)
+
 def main():
     print("\nLoading missions and checking for conflicts...")
     primary_mission = load_mission('data/primary_mission.json')
     simulated_flights = load_flight_schedules('data/flight_schedules.json')
 
     print("\nRunning initial conflict detection...")
-    conflicts = run_simulation(primary_mission, simulated_flights)
+    # Only the primary mission needs validating, so skip simulated-vs-simulated pairs.
+    # Clustering gives one conflict per encounter, and so one resolution request each.
+    conflicts = run_simulation(primary_mission, simulated_flights, mode='query', cluster=True)
+
+    # No-fly zone violations are reported alongside drone-to-drone conflicts
+    geofences = load_geofences('data/geofences.json')
+    if geofences:
+        print(f"\nChecking mission against {len(geofences)} no-fly zones...")
+        conflicts.extend(check_geofence_violations(primary_mission, geofences))
 
     # Show initial visualization
     print("\nShowing initial mission paths...")
@@ -0,0 +1,207 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import json
+import time
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+
+from deconfliction.occupancy_grid import OccupancyGrid
+from deconfliction.time_normalization import normalize_flight, parse_timestamp
+from simulation.simulator import run_simulation, build_fleet_index, SPATIAL_SAFETY_BUFFER, TEMPORAL_SAFETY_BUFFER
+
+# Margin around each mission when splitting a batch into independent regions;
+# it leaves room for the path and altitude changes a resolution may make
+REGION_DISTANCE_MARGIN = 50.0
+
+def order_missions(missions):
+    """Sort candidate missions by priority (highest first), then by filing time (earliest first)."""
+    return sorted(missions, key=lambda mission: (
+        -mission.get('priority', 0),
+        parse_timestamp(mission['filed_at']) if mission.get('filed_at') else float('inf')
+    ))
+
+def llm_resolver(mission, conflicts):
+    """Resolve a mission's conflicts with the Hugging Face suggestions used by main.py."""
+    from deconfliction.conflict_resolver import get_conflict_resolution, create_resolved_mission
+    solutions = get_conflict_resolution(conflicts)
+    if not solutions:
+        return None
+    return create_resolved_mission(mission, solutions)
+
+def plan_region(missions, simulated_flights, resolver=None, screen=False):
+    """
+    Deconflict missions one at a time in priority order against a shared index.
+
+    The index starts with the schedule; every accepted mission is inserted into
+    it, so later (lower priority) missions are checked against earlier ones.
+
+    Parameters:
+    missions (list): Candidate missions, each with a 'mission_id'.
+    simulated_flights (dict): The existing flight schedule.
+    resolver (callable): Optional resolver(mission, conflicts) returning a modified
+                         mission or None. Resolved missions are re-checked before
+                         they are accepted. Missions with conflicts are rejected
+                         if there is no resolver.
+    screen (bool): Keep an OccupancyGrid of the schedule and accepted missions.
+                   Missions and resolved candidates it proves clear of all
+                   traffic skip the full check; all others still get it, so
+                   screening never changes which missions are accepted.
+
+    Returns:
+    dict: 'accepted' and 'rejected' lists of per-mission results.
+    """
+    fleet_index = build_fleet_index(simulated_flights)
+    occupancy = OccupancyGrid.from_schedule(simulated_flights) if screen else None
+    screen_distance = max(SPATIAL_SAFETY_BUFFER, TEMPORAL_SAFETY_BUFFER)
+
+    def find_conflicts(candidate):
+        if occupancy is not None and occupancy.provably_clear(candidate, screen_distance):
+            return []
+        return run_simulation(candidate, simulated_flights, mode='query', fleet_index=fleet_index, cluster=True)
+
+    accepted, rejected = [], []
+    for mission in order_missions(missions):
+        mission_id = mission['mission_id']
+        conflicts = find_conflicts(mission)
+        final_mission = mission
+        if conflicts and resolver is not None:
+            candidate = resolver(mission, conflicts)
+            if candidate is not None and not find_conflicts(candidate):
+                final_mission = candidate
+                conflicts = []
+
+        if conflicts:
+            print(f"Rejected mission {mission_id}: {len(conflicts)} unresolved conflicts")
+            rejected.append({'mission_id': mission_id, 'conflicts': conflicts})
+        else:
+            normalized = normalize_flight(final_mission, drone_id=mission_id)
+            fleet_index.add_flight(normalized)
+            if occupancy is not None:
+                occupancy.add_flight(normalized)
+            accepted.append({'mission_id': mission_id, 'mission': final_mission,
+                             'resolved': final_mission is not mission})
+    return {'accepted': accepted, 'rejected': rejected}
+
+def partition_regions(missions, distance_margin=REGION_DISTANCE_MARGIN):
+    """
+    Split missions into groups that cannot affect each other.
+
+    Two missions share a region when their waypoint bounding boxes, widened by
+    distance_margin, overlap; regions are the connected components of that
+    relation. Time windows are deliberately ignored: the spatial check flags
+    missions on the same track at any time, so missions far apart in time can
+    still conflict and must be planned in the same order as with one worker.
+
+    Returns:
+    list: Lists of missions, one per independent region.
+    """
+    if not missions:
+        return []
+    normalized = [normalize_flight(mission, drone_id=mission['mission_id']) for mission in missions]
+    low = np.array([flight['positions'].min(axis=0) for flight in normalized]) - distance_margin
+    high = np.array([flight['positions'].max(axis=0) for flight in normalized]) + distance_margin
+
+    overlapping = ((low[:, None, :] <= high[None, :, :]) & (high[:, None, :] >= low[None, :, :])).all(axis=2)
+    region_count, labels = connected_components(csr_matrix(overlapping), directed=False)
+    return [[missions[idx] for idx in np.flatnonzero(labels == region)] for region in range(region_count)]
+
+def recheck_resolutions(results, rank):
+    """
+    Re-check resolved missions against the missions accepted in other regions.
+
+    Regions are split on the missions as filed, but a resolver may move a
+    mission anywhere, including into another region's airspace. Each resolved
+    mission, in priority order, is checked against the other regions' accepted
+    missions and moved to the rejected list if it conflicts with any of them.
+    It was already cleared against the schedule and its own region.
+
+    Parameters:
+    results (list): plan_region results, one per region; updated in place.
+    rank (dict): Priority rank of each mission_id.
+    """
+    accepted = sorted(((region, entry) for region, result in enumerate(results) for entry in result['accepted']),
+                      key=lambda item: rank[item[1]['mission_id']])
+    for region, entry in accepted:
+        if not entry['resolved']:
+            continue
+        others = [dict(other['mission'], drone_id=other['mission_id'])
+                  for idx, result in enumerate(results) if idx != region for other in result['accepted']]
+        if not others:
+            continue
+        conflicts = run_simulation(entry['mission'], {'flights': others}, mode='query', cluster=True)
+        if conflicts:
+            print(f"Rejected mission {entry['mission_id']}: resolution conflicts with {len(conflicts)} "
+                  f"missions accepted in other regions")
+            results[region]['accepted'].remove(entry)
+            results[region]['rejected'].append({'mission_id': entry['mission_id'], 'conflicts': conflicts})
+
+def plan_missions(missions, simulated_flights, resolver=None, workers=1, screen=False):
+    """
+    Batch-plan many candidate missions against the schedule and each other.
+
+    With workers > 1 the batch is split into independent spatial regions
+    (partition_regions) that are planned in parallel processes, each with its
+    own incremental index; resolver must then be a picklable top-level function.
+    Resolved missions are re-checked across regions afterwards (recheck_resolutions),
+    so the accepted missions never conflict with each other.
+
+    Returns:
+    dict: 'accepted' and 'rejected' results (see plan_region) in priority order plus 'regions',
+          'elapsed' seconds and 'throughput' in missions per second.
+    """
+    started = time.perf_counter()
+    if workers > 1:
+        regions = partition_regions(missions)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(plan_region, regions, [simulated_flights] * len(regions),
+                                        [resolver] * len(regions), [screen] * len(regions)))
+    else:
+        regions = [missions]
+        results = [plan_region(missions, simulated_flights, resolver, screen)]
+
+    # Report in priority order however the batch was split
+    rank = {mission['mission_id']: idx for idx, mission in enumerate(order_missions(missions))}
+    if len(results) > 1 and resolver is not None:
+        recheck_resolutions(results, rank)
+    elapsed = time.perf_counter() - started
+    report = {
+        'accepted': sorted((entry for result in results for entry in result['accepted']),
+                           key=lambda entry: rank[entry['mission_id']]),
+        'rejected': sorted((entry for result in results for entry in result['rejected']),
+                           key=lambda entry: rank[entry['mission_id']]),
+        'regions': len(regions),
+        'elapsed': elapsed,
+        'throughput': len(missions) / elapsed if elapsed > 0 else float('inf')
+    }
+    print(f"Planned {len(missions)} missions in {elapsed:.2f}s ({report['throughput']:.1f} missions/s) "
+          f"across {report['regions']} region(s): {len(report['accepted'])} accepted, "
+          f"{len(report['rejected'])} rejected")
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Deconflict a batch of filed missions against the flight schedule.")
+    parser.add_argument('missions', help="JSON file with {'missions': [...]}, each with 'mission_id', "
+                                         "optional 'priority' and 'filed_at'")
+    parser.add_argument('--schedule', default='data/flight_schedules.json', help="flight schedule JSON file")
+    parser.add_argument('--workers', type=int, default=1, help="parallel processes for independent regions")
+    parser.add_argument('--resolve', action='store_true', help="try AI resolution for conflicting missions")
+    parser.add_argument('--screen', action='store_true',
+                        help="skip the full check for missions an airspace occupancy grid proves clear")
+    parser.add_argument('--output', help="write accepted missions to this JSON file")
+    args = parser.parse_args()
+
+    with open(args.missions, 'r') as file:
+        missions = json.load(file)['missions']
+    with open(args.schedule, 'r') as file:
+        simulated_flights = json.load(file)
+
+    report = plan_missions(missions, simulated_flights, llm_resolver if args.resolve else None, args.workers,
+                           args.screen)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({'missions': [entry['mission'] for entry in report['accepted']]}, file, indent=2)
+
+if __name__ == "__main__":
+    main()
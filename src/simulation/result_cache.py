@@ -0,0 +1,163 @@
+from collections import OrderedDict
+import hashlib
+import json
+import math
+import os
+import re
+
+from deconfliction.time_normalization import normalize_flight
+
+def _digest(payload):
+    """SHA-256 of a JSON-serializable payload in canonical form."""
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+def schedule_version(simulated_flights):
+    """
+    Return a stable version string for a flight schedule.
+
+    Schedules that carry an explicit 'version' field use it as-is; otherwise the
+    version is a hash of the schedule contents, so any edit changes it.
+    """
+    if simulated_flights.get('version') is not None:
+        return str(simulated_flights['version'])
+    return _digest(simulated_flights)[:16]
+
+def cache_key(primary_mission, version, **parameters):
+    """
+    Content-addressed key for one detection run.
+
+    The mission is hashed after time normalization, so equivalent spellings of
+    the same timestamps or coordinates ('Z' vs '+00:00', 10 vs 10.0) share a key.
+    parameters holds everything else that affects the result (safety buffers, mode, ...).
+    """
+    normalized = normalize_flight(primary_mission, drone_id='primary')
+    return _digest({
+        'positions': normalized['positions'].tolist(),
+        'times': [None if math.isnan(t) else t for t in normalized['times'].tolist()],
+        'time_window': [normalized['start'], normalized['end']],
+        'schedule_version': version,
+        'parameters': parameters
+    })
+
+def _decode(serialized):
+    """Load cached conflicts, restoring the tuples that JSON turned into lists."""
+    conflicts = json.loads(serialized)
+    for conflict in conflicts:
+        for field in ('position', 'interval'):
+            if isinstance(conflict.get(field), list):
+                conflict[field] = tuple(conflict[field])
+    return conflicts
+
+class ResultCache:
+    """
+    Two-tier cache of run_simulation results (lists of conflict dicts).
+
+    A bounded in-memory LRU tier sits in front of an optional on-disk tier laid
+    out as <cache_dir>/results-<hash of schedule version>/<key>.json. Results are
+    stored as JSON so every hit returns a fresh copy that callers may modify.
+    The cache directory may be shared: invalidation only deletes files matching
+    this layout.
+    """
+
+    _VERSION_DIR = re.compile(r'^results-[0-9a-f]{16}$')
+    _RESULT_FILE = re.compile(r'^[0-9a-f]{64}\.json$')
+
+    def __init__(self, max_entries=128, cache_dir=None):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.schedule_version = None
+        self._memory = OrderedDict()  # key -> (version, serialized result)
+        self.hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _version_dir(self, version):
+        # Versions come from schedule data, so they are hashed rather than used as path components
+        return os.path.join(self.cache_dir, f"results-{_digest(str(version))[:16]}")
+
+    def _disk_path(self, key, version):
+        return os.path.join(self._version_dir(version), f"{key}.json")
+
+    def _remove_version_dir(self, path):
+        """Delete the result files this cache wrote to a version directory, then the directory if empty."""
+        for name in os.listdir(path):
+            if self._RESULT_FILE.match(name):
+                os.remove(os.path.join(path, name))
+        try:
+            os.rmdir(path)
+        except OSError:
+            pass  # Foreign files remain; leave them alone
+
+    def get(self, key, version):
+        """Return the cached result for key, or None on a miss."""
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            self.memory_hits += 1
+            return _decode(entry[1])
+
+        if self.cache_dir:
+            path = self._disk_path(key, version)
+            if os.path.exists(path):
+                with open(path, 'r') as file:
+                    serialized = file.read()
+                self._remember(key, version, serialized)
+                self.hits += 1
+                self.disk_hits += 1
+                return _decode(serialized)
+
+        self.misses += 1
+        return None
+
+    def put(self, key, version, result):
+        """Store a result in memory and, if configured, on disk."""
+        serialized = json.dumps(result)
+        self._remember(key, version, serialized)
+        if self.cache_dir:
+            path = self._disk_path(key, version)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as file:
+                file.write(serialized)
+
+    def _remember(self, key, version, serialized):
+        self._memory[key] = (version, serialized)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def invalidate(self, version=None):
+        """Drop all entries for one schedule version, or everything if version is None."""
+        if version is None:
+            self._memory.clear()
+            if self.cache_dir and os.path.isdir(self.cache_dir):
+                for name in os.listdir(self.cache_dir):
+                    path = os.path.join(self.cache_dir, name)
+                    if self._VERSION_DIR.match(name) and os.path.isdir(path):
+                        self._remove_version_dir(path)
+            return
+        for key in [key for key, (entry_version, _) in self._memory.items() if entry_version == version]:
+            del self._memory[key]
+        if self.cache_dir and os.path.isdir(self._version_dir(version)):
+            self._remove_version_dir(self._version_dir(version))
+
+    def set_schedule_version(self, version):
+        """Record the current schedule version, invalidating the previous one if it changed."""
+        if self.schedule_version is not None and version != self.schedule_version:
+            print(f"Flight schedule changed ({self.schedule_version} -> {version}), invalidating cached results")
+            self.invalidate(self.schedule_version)
+        self.schedule_version = version
+
+    def stats(self):
+        """Cache metrics: hit and miss counts per tier, overall hit rate and memory entries."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': len(self._memory)
+        }
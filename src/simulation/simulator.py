@@ -1,5 +1,19 @@
-from deconfliction.spatial_check import check_spatial_conflict
-from deconfliction.temporal_check import check_temporal_conflict
+import argparse
+from itertools import chain
+import json
+import sys
+
+from deconfliction.spatial_check import check_spatial_conflict, iter_spatial_conflicts
+from deconfliction.temporal_check import check_temporal_conflict, iter_temporal_conflicts
+from deconfliction.time_normalization import normalize_flight, normalize_schedule
+from deconfliction.fleet_index import FleetIndex, flight_proximity
+from deconfliction.conflict_clustering import cluster_conflicts
+from deconfliction.conflict_sinks import NDJSONSink, SummarySink, stream_conflicts
+from simulation.result_cache import cache_key, schedule_version
+
+# Default safety buffers used by the spatial and temporal checks
+SPATIAL_SAFETY_BUFFER = 2.0
+TEMPORAL_SAFETY_BUFFER = 1.0
 
 def deduplicate_conflicts(conflicts):
     """
@@ -19,7 +33,30 @@ def deduplicate_conflicts(conflicts):
     
     return list(unique_conflicts.values())
 
-def run_simulation(primary_mission, simulated_flights):
+def build_fleet_index(simulated_flights):
+    """Index the simulated flights once so many primary missions can be queried against them."""
+    return FleetIndex.from_schedule(simulated_flights, cell_size=max(SPATIAL_SAFETY_BUFFER, TEMPORAL_SAFETY_BUFFER))
+
+def is_clear(primary_mission, simulated_flights, fleet_index=None):
+    """
+    Go/no-go check: return True if the primary mission has no conflicts with the fleet.
+
+    Uses the lazy detectors in 'query' mode, nearest candidates first, and stops
+    at the first confirmed conflict instead of collecting all of them.
+    """
+    normalized = [normalize_flight(primary_mission, drone_id='primary')]
+    if fleet_index is None:
+        fleet_index = build_fleet_index(simulated_flights)
+
+    conflicts = chain(
+        iter_spatial_conflicts(primary_mission, simulated_flights, SPATIAL_SAFETY_BUFFER, normalized,
+                               mode='query', fleet_index=fleet_index, nearest_first=True),
+        iter_temporal_conflicts(primary_mission, simulated_flights, TEMPORAL_SAFETY_BUFFER, normalized,
+                                mode='query', fleet_index=fleet_index, nearest_first=True)
+    )
+    return next(conflicts, None) is None
+
+def run_simulation(primary_mission, simulated_flights, mode='audit', fleet_index=None, cluster=False, cache=None):
     """
     Simulates the flight paths of the primary drone and other simulated drones,
     checking for conflicts in both space and time.
@@ -27,21 +64,134 @@ def run_simulation(primary_mission, simulated_flights):
     Parameters:
     primary_mission (dict): The primary drone's mission data including waypoints and time window.
     simulated_flights (list): A list of simulated flight paths, each containing waypoints and timings.
+    mode (str): 'audit' checks all pairs of flights; 'query' checks only the primary mission
+                against the fleet, which is all that is needed to validate a new mission.
+    fleet_index (FleetIndex): Optional prebuilt index of simulated_flights for 'query' mode.
+    cluster (bool): Merge conflicts of the same flight pair into conflict episodes.
+    cache (ResultCache): Optional cache of previous results for identical missions
+                         against the same schedule version and safety buffers.
+                         Cannot be combined with fleet_index, which may hold flights
+                         (such as accepted missions) that are not in simulated_flights.
 
     Returns:
     dict: A dictionary containing the simulation results, including any detected conflicts.
     """
+    if cache is not None:
+        if fleet_index is not None:
+            raise ValueError("run_simulation cannot use a cache together with a fleet_index; "
+                             "cached results are keyed on simulated_flights only")
+        version = schedule_version(simulated_flights)
+        cache.set_schedule_version(version)
+        key = cache_key(primary_mission, version, spatial_buffer=SPATIAL_SAFETY_BUFFER,
+                        temporal_buffer=TEMPORAL_SAFETY_BUFFER, mode=mode, cluster=cluster)
+        cached = cache.get(key, version)
+        if cached is not None:
+            print(f"Returning cached result ({len(cached)} conflicts)")
+            return cached
+
     conflicts = []
 
+    # Convert all waypoint times and windows to epoch seconds once for both checks
+    if mode == 'query':
+        normalized = [normalize_flight(primary_mission, drone_id='primary')]
+        if fleet_index is None:
+            fleet_index = build_fleet_index(simulated_flights)
+    else:
+        normalized = normalize_schedule(primary_mission, simulated_flights)
+
     # Perform spatial conflict checks
-    spatial_conflicts = check_spatial_conflict(primary_mission, simulated_flights)
+    spatial_conflicts = check_spatial_conflict(primary_mission, simulated_flights, SPATIAL_SAFETY_BUFFER,
+                                               normalized=normalized, mode=mode, fleet_index=fleet_index)
     if spatial_conflicts:
         conflicts.extend(spatial_conflicts)
 
     # Perform temporal conflict checks
-    temporal_conflicts = check_temporal_conflict(primary_mission, simulated_flights)
+    temporal_conflicts = check_temporal_conflict(primary_mission, simulated_flights, TEMPORAL_SAFETY_BUFFER,
+                                                 normalized=normalized, mode=mode, fleet_index=fleet_index)
     if temporal_conflicts:
         conflicts.extend(temporal_conflicts)
 
     # Deduplicate conflicts, preferring ones with timing information
-    return deduplicate_conflicts(conflicts)
\ No newline at end of file
+    conflicts = deduplicate_conflicts(conflicts)
+    if cluster:
+        conflicts = cluster_conflicts(conflicts)
+
+    if cache is not None:
+        cache.put(key, version, conflicts)
+    return conflicts
+
+def iter_simulation_conflicts(primary_mission, simulated_flights, mode='audit', fleet_index=None):
+    """
+    Lazily yield the deduplicated conflicts run_simulation would return, without clustering.
+
+    Duplicates only ever share a flight pair, so in 'audit' mode the spatial and
+    temporal checks run one flight pair at a time and only that pair's conflicts
+    are deduplicated and held; pairs whose bounding boxes are further apart than
+    both safety buffers are skipped. Memory stays bounded by the largest pair,
+    not by the number of conflicts in the audit.
+    """
+    if mode == 'query':
+        normalized = [normalize_flight(primary_mission, drone_id='primary')]
+        if fleet_index is None:
+            fleet_index = build_fleet_index(simulated_flights)
+        yield from deduplicate_conflicts(chain(
+            iter_spatial_conflicts(primary_mission, simulated_flights, SPATIAL_SAFETY_BUFFER, normalized,
+                                   mode='query', fleet_index=fleet_index),
+            iter_temporal_conflicts(primary_mission, simulated_flights, TEMPORAL_SAFETY_BUFFER, normalized,
+                                    mode='query', fleet_index=fleet_index)
+        ))
+        return
+    if mode != 'audit':
+        raise ValueError(f"Unknown conflict check mode: {mode}")
+
+    all_flights = normalize_schedule(primary_mission, simulated_flights)
+    reach = max(SPATIAL_SAFETY_BUFFER, TEMPORAL_SAFETY_BUFFER)
+    for i in range(len(all_flights)):
+        for j in range(i + 1, len(all_flights)):
+            pair = [all_flights[i], all_flights[j]]
+            if flight_proximity(*pair)[0] >= reach:
+                continue
+            yield from deduplicate_conflicts(chain(
+                iter_spatial_conflicts(None, None, SPATIAL_SAFETY_BUFFER, pair, mode='audit'),
+                iter_temporal_conflicts(None, None, TEMPORAL_SAFETY_BUFFER, pair, mode='audit')
+            ))
+
+def stream_simulation(primary_mission, simulated_flights, *sinks, mode='audit', fleet_index=None):
+    """
+    Run the conflict checks and stream every conflict to the given sinks as it is found.
+
+    Use this instead of run_simulation for large audits: conflicts are never
+    collected into lists, so memory does not grow with their number.
+
+    Parameters:
+    sinks: Conflict sinks such as NDJSONSink or SummarySink; closed at the end.
+
+    Returns:
+    int: Number of conflicts streamed.
+    """
+    return stream_conflicts(iter_simulation_conflicts(primary_mission, simulated_flights, mode, fleet_index),
+                            *sinks)
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream a full schedule audit as NDJSON conflicts.")
+    parser.add_argument('--schedule', default='data/flight_schedules.json', help="flight schedule JSON file")
+    parser.add_argument('--mission', default='data/primary_mission.json', help="primary mission JSON file")
+    parser.add_argument('--output', default='-', help="NDJSON output file, '-' for stdout")
+    parser.add_argument('--no-explain', action='store_true', help="omit the explanation text from records")
+    args = parser.parse_args()
+
+    with open(args.mission, 'r') as file:
+        primary_mission = json.load(file)
+    with open(args.schedule, 'r') as file:
+        simulated_flights = json.load(file)
+
+    summary = SummarySink()
+    stream_simulation(primary_mission, simulated_flights, NDJSONSink(args.output, explain=not args.no_explain),
+                      summary)
+    # Keep stdout clean for the NDJSON records
+    report = summary.summary()
+    print(f"Audit found {report['conflicts']} conflicts between {report['pairs']} flight pairs, "
+          f"minimum separation {report['min_separation']}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -8,10 +8,19 @@ else:
     matplotlib.use('Agg')
 
 from matplotlib import pyplot as plt
+from matplotlib import animation
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 from mpl_toolkits.mplot3d import Axes3D
+from mpl_toolkits.mplot3d.art3d import Line3DCollection
 from matplotlib.animation import FuncAnimation
 import numpy as np
 from scipy.interpolate import interp1d
+from concurrent.futures import ProcessPoolExecutor
+import ast
+import os
+import subprocess
+import tempfile
 import time
 import threading
 
@@ -48,10 +57,125 @@ def interpolate_path(waypoints, num_points=100):
     
     return smooth_path
 
-def plot_missions(primary_mission, simulated_flights, resolved_mission=None):
-    """Plot the flight paths in 3D space. If resolved_mission is provided, show it alongside original paths."""
+# Fleets larger than this are drawn with plot_missions' large-fleet renderer by default
+LARGE_FLEET_THRESHOLD = 50
+
+def decimate_paths(paths, tolerance):
+    """
+    Drop path vertices that would land on the same screen cell as the previous vertex.
+
+    All paths are snapped to a grid of size tolerance in one vectorized pass;
+    a vertex is kept if its cell differs from the previous vertex of the same
+    path. The first and last vertex of every path are always kept.
+    """
+    if not paths:
+        return []
+    lengths = np.array([len(path) for path in paths])
+    points = np.vstack(paths)
+    if tolerance <= 0:
+        return paths
+    cells = np.floor(points / tolerance)
+    keep = np.ones(len(points), dtype=bool)
+    keep[1:] = (cells[1:] != cells[:-1]).any(axis=1)
+    ends = np.cumsum(lengths)
+    keep[ends - lengths] = True  # First vertex of each path
+    keep[ends - 1] = True  # Last vertex of each path
+    kept_counts = np.add.reduceat(keep, ends - lengths)
+    return np.split(points[keep], np.cumsum(kept_counts)[:-1])
+
+def _legs(points):
+    """Start and end points of each leg of a waypoint path; a single waypoint is one zero-length leg."""
+    if len(points) == 1:
+        return points, points
+    return points[:-1], points[1:]
+
+def _segment_distances(starts1, ends1, starts2, ends2):
+    """
+    Minimum distance between every segment of one set and every segment of another.
+
+    Vectorized closest-point-of-two-segments computation: the unconstrained
+    closest parameters are clamped to [0, 1] and the other parameter is then
+    recomputed for the clamped value. Zero-length segments are handled as points.
+
+    Returns:
+    array: len(starts1) x len(starts2) distances.
+    """
+    p1, p2 = starts1[:, None, :], starts2[None, :, :]
+    d1, d2 = (ends1 - starts1)[:, None, :], (ends2 - starts2)[None, :, :]
+    r = p1 - p2
+    a = (d1 * d1).sum(axis=-1)
+    e = (d2 * d2).sum(axis=-1)
+    b = (d1 * d2).sum(axis=-1)
+    c = (d1 * r).sum(axis=-1)
+    f = (d2 * r).sum(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        denominator = a * e - b * b
+        s = np.where(denominator > 1e-12, np.clip((b * f - c * e) / denominator, 0.0, 1.0), 0.0)
+        s = np.where(e > 1e-12, s, np.where(a > 1e-12, np.clip(-c / a, 0.0, 1.0), 0.0))
+        t = np.where(e > 1e-12, (b * s + f) / e, 0.0)
+        # Re-clamp s wherever t had to be clamped
+        s = np.where(t < 0, np.where(a > 1e-12, np.clip(-c / a, 0.0, 1.0), 0.0), s)
+        s = np.where(t > 1, np.where(a > 1e-12, np.clip((b - c) / a, 0.0, 1.0), 0.0), s)
+    t = np.clip(t, 0.0, 1.0)
+    closest = (p1 + d1 * s[..., None]) - (p2 + d2 * t[..., None])
+    return np.sqrt((closest ** 2).sum(axis=-1))
+
+def flights_within_radius(primary_mission, simulated_flights, radius):
+    """
+    Return the simulated flights that pass within radius of the primary mission's path.
+
+    Distances are measured between path legs, not just waypoints, so a flight
+    whose leg crosses the primary path between two distant waypoints is kept.
+    Legs whose bounding box, widened by radius, misses the primary path's
+    bounding box are ruled out before the exact segment distances are computed.
+    """
+    flights = simulated_flights['flights']
+    if not flights:
+        return []
+    primary = np.array([(wp['x'], wp['y'], wp.get('z', 0)) for wp in primary_mission['waypoints']], dtype=float)
+    primary_starts, primary_ends = _legs(primary)
+    low, high = primary.min(axis=0) - radius, primary.max(axis=0) + radius
+
+    starts, ends, owners = [], [], []
+    for idx, flight in enumerate(flights):
+        points = np.array([(wp['x'], wp['y'], wp.get('z', 0)) for wp in flight['waypoints']], dtype=float)
+        flight_starts, flight_ends = _legs(points)
+        starts.append(flight_starts)
+        ends.append(flight_ends)
+        owners.append(np.full(len(flight_starts), idx))
+    starts, ends, owners = np.vstack(starts), np.vstack(ends), np.concatenate(owners)
+
+    overlapping = ((np.minimum(starts, ends) <= high) & (np.maximum(starts, ends) >= low)).all(axis=1)
+    starts, ends, owners = starts[overlapping], ends[overlapping], owners[overlapping]
+    near = np.zeros(len(owners), dtype=bool)
+    for chunk in range(0, len(owners), 4096):
+        distances = _segment_distances(primary_starts, primary_ends, starts[chunk:chunk + 4096],
+                                       ends[chunk:chunk + 4096])
+        near[chunk:chunk + 4096] = (distances <= radius).any(axis=0)
+    return [flights[idx] for idx in np.unique(owners[near])]
+
+def plot_missions(primary_mission, simulated_flights, resolved_mission=None, large_fleet=None,
+                  tolerance_px=1.0, radius=None):
+    """
+    Plot the flight paths in 3D space. If resolved_mission is provided, show it alongside original paths.
+
+    Parameters:
+    large_fleet (bool): Draw the fleet as one Line3DCollection of decimated raw
+                        waypoint paths instead of one smoothed line per drone.
+                        Defaults to True above LARGE_FLEET_THRESHOLD flights.
+    tolerance_px (float): Decimation tolerance in screen pixels for large-fleet mode.
+    radius (float): Only show simulated flights whose path comes within this
+                    distance of the primary mission's path.
+    """
     try:
         debug_print("Starting mission path plotting...")
+        flights = simulated_flights['flights']
+        if radius is not None:
+            flights = flights_within_radius(primary_mission, simulated_flights, radius)
+            debug_print(f"Showing {len(flights)} flights within {radius} of the primary mission")
+        if large_fleet is None:
+            large_fleet = len(flights) > LARGE_FLEET_THRESHOLD
+
         plt.ioff()  # Turn off interactive mode
         fig = plt.figure(figsize=(12, 8))
         ax = fig.add_subplot(111, projection='3d')
@@ -74,14 +198,33 @@ def plot_missions(primary_mission, simulated_flights, resolved_mission=None):
             ax.plot(resolved_smooth_path[:, 0], resolved_smooth_path[:, 1], resolved_smooth_path[:, 2],
                     color='green', linestyle='-', alpha=0.8, label='Resolved Primary Path')
         
-        # Plot simulated flight paths
-        colors = ['red', 'orange', 'purple']
-        for idx, flight in enumerate(simulated_flights['flights']):
-            waypoints = np.array([(wp['x'], wp['y'], wp.get('z', 0)) for wp in flight['waypoints']])
-            smooth_path = interpolate_path(waypoints)
-            ax.plot(smooth_path[:, 0], smooth_path[:, 1], smooth_path[:, 2], 
-                    color=colors[idx % len(colors)], linestyle='--', alpha=0.5,
-                    label=f'Flight {flight["drone_id"]} Path')
+        if large_fleet:
+            # Axis limits come straight from the raw waypoint bounds
+            raw_paths = [np.array([(wp['x'], wp['y'], wp.get('z', 0)) for wp in flight['waypoints']], dtype=float)
+                         for flight in flights]
+            all_points = np.vstack([primary_smooth_path] + raw_paths)
+            
+            # Convert the pixel tolerance to data units for the widest axis
+            extent = (all_points.max(axis=0) - all_points.min(axis=0)).max()
+            tolerance = tolerance_px * extent / (fig.get_size_inches()[0] * fig.dpi)
+            segments = decimate_paths([path for path in raw_paths if len(path) > 1], tolerance)
+            
+            colors = ['red', 'orange', 'purple']
+            ax.add_collection3d(Line3DCollection(segments, colors=colors, linewidths=0.5, alpha=0.3,
+                                                 linestyles='--', label=f'{len(flights)} Simulated Flights'))
+            debug_print(f"Drew {len(segments)} flights with {sum(len(s) for s in segments)} vertices")
+        else:
+            # Plot simulated flight paths
+            colors = ['red', 'orange', 'purple']
+            smooth_paths = []
+            for idx, flight in enumerate(flights):
+                waypoints = np.array([(wp['x'], wp['y'], wp.get('z', 0)) for wp in flight['waypoints']])
+                smooth_path = interpolate_path(waypoints)
+                smooth_paths.append(smooth_path)
+                ax.plot(smooth_path[:, 0], smooth_path[:, 1], smooth_path[:, 2], 
+                        color=colors[idx % len(colors)], linestyle='--', alpha=0.5,
+                        label=f'Flight {flight["drone_id"]} Path')
+            all_points = np.vstack([primary_smooth_path] + smooth_paths)
         
         # Set plot properties
         ax.set_title('3D Flight Paths')
@@ -90,12 +233,6 @@ def plot_missions(primary_mission, simulated_flights, resolved_mission=None):
         ax.set_zlabel('Altitude (Z)')
         
         # Calculate plot limits
-        all_paths = [primary_smooth_path]
-        for flight in simulated_flights['flights']:
-            waypoints = np.array([(wp['x'], wp['y'], wp.get('z', 0)) for wp in flight['waypoints']])
-            all_paths.append(interpolate_path(waypoints))
-        all_points = np.vstack(all_paths)
-        
         padding = 2.0
         ax.set_xlim(all_points[:, 0].min() - padding, all_points[:, 0].max() + padding)
         ax.set_ylim(all_points[:, 1].min() - padding, all_points[:, 1].max() + padding)
@@ -112,6 +249,116 @@ def plot_missions(primary_mission, simulated_flights, resolved_mission=None):
         debug_print(f"Error in plot_missions: {str(e)}")
         raise
 
+def _conflict_position(conflict):
+    """Return a conflict's (x, y, z) position, parsing the location string only if needed."""
+    if conflict.get('position') is not None:
+        return tuple(conflict['position'])
+    return tuple(ast.literal_eval(conflict['location']))
+
+def precompute_animation(conflicts, primary_mission, simulated_flights, resolved_mission=None, num_frames=1000):
+    """
+    Precompute everything the conflict animation needs for every frame as arrays.
+
+    Returns:
+    dict: 'tracks' (one entry per drone with its smooth path and styling),
+          'visible' (tracks x frames, number of path points drawn), the per-frame
+          'conflict_index', 'marker_sizes' and 'azimuth', plus 'conflict_positions',
+          'conflict_labels' and axis 'limits'.
+    """
+    colors = ['red', 'orange', 'purple']
+    tracks = [{
+        'path': interpolate_path(np.array([(wp['x'], wp['y'], wp.get('z', 0)) for wp in primary_mission['waypoints']])),
+        'color': 'blue', 'linestyle': '-', 'alpha': 0.5,
+        'path_label': 'Original Primary Path', 'label': 'Original Primary'
+    }]
+    if resolved_mission:
+        tracks.append({
+            'path': interpolate_path(np.array([(wp['x'], wp['y'], wp.get('z', 0)) for wp in resolved_mission['waypoints']])),
+            'color': 'green', 'linestyle': '-', 'alpha': 0.8,
+            'path_label': 'Resolved Path', 'label': 'Resolved Primary'
+        })
+    for idx, flight in enumerate(simulated_flights['flights']):
+        tracks.append({
+            'path': interpolate_path(np.array([(wp['x'], wp['y'], wp.get('z', 0)) for wp in flight['waypoints']])),
+            'color': colors[idx % len(colors)], 'linestyle': '--', 'alpha': 0.5,
+            'path_label': f'Flight {flight["drone_id"]} Path', 'label': f'Flight {flight["drone_id"]}'
+        })
+
+    frames = np.arange(num_frames)
+    progress = (frames % 100) / 100
+    visible = np.stack([(len(track['path']) * progress).astype(int) for track in tracks])
+
+    # Axis limits cover the original primary path and the simulated flights
+    all_points = np.vstack([track['path'] for track in tracks if track['label'] != 'Resolved Primary'])
+    padding = 2.0
+
+    return {
+        'tracks': tracks,
+        'visible': visible,
+        'conflict_index': (frames // 100) % len(conflicts),
+        'conflict_positions': np.array([_conflict_position(conflict) for conflict in conflicts], dtype=float),
+        'conflict_labels': [f'Time: {conflict["time"]}\nFlight: {conflict["involved_flights"][0]}\n'
+                            for conflict in conflicts],
+        'marker_sizes': 200 + 100 * np.sin(frames * 0.1),
+        'azimuth': frames % 360,
+        'limits': (all_points.min(axis=0) - padding, all_points.max(axis=0) + padding)
+    }
+
+def _build_animation_artists(ax, scene):
+    """Create the empty artists for an animation scene and configure the axes."""
+    artists = {'paths': [], 'drones': []}
+    for track in scene['tracks']:
+        path, = ax.plot([], [], [], color=track['color'], linestyle=track['linestyle'], alpha=track['alpha'],
+                        label=track['path_label'])
+        drone = ax.scatter([], [], [], color=track['color'], marker='o', s=100, label=track['label'])
+        artists['paths'].append(path)
+        artists['drones'].append(drone)
+    artists['conflict_marker'] = ax.scatter([], [], [], color='red', s=200, marker='*', label='Conflict')
+    artists['time_text'] = ax.text2D(0.02, 0.95, '', transform=ax.transAxes)
+
+    low, high = scene['limits']
+    ax.set_xlim(low[0], high[0])
+    ax.set_ylim(low[1], high[1])
+    ax.set_zlim(low[2], high[2])
+    ax.set_xlabel('X Coordinate')
+    ax.set_ylabel('Y Coordinate')
+    ax.set_zlabel('Altitude (Z)')
+    ax.grid(True)
+    ax.legend(bbox_to_anchor=(1.15, 1), loc='upper right')
+    return artists
+
+def _update_animation_frame(ax, artists, scene, frame, state):
+    """
+    Move the artists to the given frame, touching only those whose data changed.
+
+    state remembers what each artist currently shows; pass an empty dict to
+    force a full redraw. Returns the list of artists that were updated.
+    """
+    changed = []
+    for idx, (track, path, drone) in enumerate(zip(scene['tracks'], artists['paths'], artists['drones'])):
+        points_to_show = scene['visible'][idx, frame]
+        if points_to_show > 0 and state.get(('track', idx)) != points_to_show:
+            smooth_path = track['path']
+            path.set_data_3d(smooth_path[:points_to_show, 0], smooth_path[:points_to_show, 1],
+                             smooth_path[:points_to_show, 2])
+            current_pos = smooth_path[min(points_to_show - 1, len(smooth_path) - 1)]
+            drone._offsets3d = ([current_pos[0]], [current_pos[1]], [current_pos[2]])
+            state[('track', idx)] = points_to_show
+            changed.extend([path, drone])
+
+    conflict_idx = scene['conflict_index'][frame]
+    if state.get('conflict') != conflict_idx:
+        location = scene['conflict_positions'][conflict_idx]
+        artists['conflict_marker']._offsets3d = ([location[0]], [location[1]], [location[2]])
+        artists['time_text'].set_text(scene['conflict_labels'][conflict_idx])
+        state['conflict'] = conflict_idx
+        changed.append(artists['time_text'])
+    artists['conflict_marker'].set_sizes([scene['marker_sizes'][frame]])
+    changed.append(artists['conflict_marker'])
+
+    ax.view_init(elev=20, azim=scene['azimuth'][frame])
+    return changed
+
 # Global variable to store the animation object
 anim = None
 
@@ -127,146 +374,127 @@ def animate_conflicts(conflicts, primary_mission, simulated_flights, resolved_mi
     fig = plt.figure(figsize=(12, 8))
     ax = fig.add_subplot(111, projection='3d')
 
-    # Convert waypoints and create smooth paths
-    primary_waypoints = np.array([(wp['x'], wp['y'], wp.get('z', 0)) for wp in primary_mission['waypoints']])
-    primary_smooth_path = interpolate_path(primary_waypoints)
-    
-    # Initialize primary drone visualization
-    primary_path, = ax.plot([], [], [], color='blue', linestyle='-', alpha=0.5, label='Original Primary Path')
-    primary_drone = ax.scatter([], [], [], color='blue', marker='o', s=100, label='Original Primary')
-    
-    # Initialize resolved mission visualization if provided
-    resolved_path = None
-    resolved_drone = None
-    if resolved_mission:
-        resolved_waypoints = np.array([(wp['x'], wp['y'], wp.get('z', 0)) for wp in resolved_mission['waypoints']])
-        resolved_smooth_path = interpolate_path(resolved_waypoints)
-        resolved_path, = ax.plot([], [], [], color='green', linestyle='-', alpha=0.8, label='Resolved Path')
-        resolved_drone = ax.scatter([], [], [], color='green', marker='o', s=100, label='Resolved Primary')
-    
-    # Initialize simulated flights
-    flight_paths = []
-    flight_drones = []
-    colors = ['red', 'orange', 'purple']
-    
-    for idx, flight in enumerate(simulated_flights['flights']):
-        waypoints = np.array([(wp['x'], wp['y'], wp.get('z', 0)) for wp in flight['waypoints']])
-        smooth_path = interpolate_path(waypoints)
-        
-        path, = ax.plot([], [], [], color=colors[idx % len(colors)], linestyle='--', alpha=0.5,
-                       label=f'Flight {flight["drone_id"]} Path')
-        drone = ax.scatter([], [], [], color=colors[idx % len(colors)], marker='o', s=100,
-                          label=f'Flight {flight["drone_id"]}')
-        
-        flight_paths.append((path, smooth_path))
-        flight_drones.append(drone)
-    
-    # Initialize conflict visualization
-    conflict_marker = ax.scatter([], [], [], color='red', s=200, marker='*', label='Conflict')
-    conflict_sphere = None  # Will be initialized in update function
-    time_text = ax.text2D(0.02, 0.95, '', transform=ax.transAxes)
-    
-    # Setup axis limits and labels
-    all_paths = [primary_smooth_path] + [path[1] for path in flight_paths]
-    all_points = np.vstack(all_paths)
-    padding = 2.0
-    ax.set_xlim(all_points[:, 0].min() - padding, all_points[:, 0].max() + padding)
-    ax.set_ylim(all_points[:, 1].min() - padding, all_points[:, 1].max() + padding)
-    ax.set_zlim(all_points[:, 2].min() - padding, all_points[:, 2].max() + padding)
-    
-    ax.set_xlabel('X Coordinate')
-    ax.set_ylabel('Y Coordinate')
-    ax.set_zlabel('Altitude (Z)')
-    ax.grid(True)
-    ax.legend(bbox_to_anchor=(1.15, 1), loc='upper right')
+    # Precompute all per-frame positions before any drawing happens
+    scene = precompute_animation(conflicts, primary_mission, simulated_flights, resolved_mission)
+    artists = _build_animation_artists(ax, scene)
     plt.subplots_adjust(right=0.85)
+    state = {}
 
     def init():
-        artists = []
-        primary_path.set_data_3d([], [], [])
-        artists.append(primary_path)
-        primary_drone._offsets3d = ([], [], [])
-        artists.append(primary_drone)
-        
-        for path, _ in flight_paths:
+        for path in artists['paths']:
             path.set_data_3d([], [], [])
-            artists.append(path)
-        for drone in flight_drones:
+        for drone in artists['drones']:
             drone._offsets3d = ([], [], [])
-            artists.append(drone)
-            
-        conflict_marker._offsets3d = ([], [], [])
-        artists.append(conflict_marker)
-        time_text.set_text('')
-        artists.append(time_text)
-        return artists
+        artists['conflict_marker']._offsets3d = ([], [], [])
+        artists['time_text'].set_text('')
+        state.clear()
+        return artists['paths'] + artists['drones'] + [artists['conflict_marker'], artists['time_text']]
 
     # Initialize a threading lock for synchronization
     lock = threading.Lock()
 
     def update(frame):
         with lock:
-            artists = []
-            base_progress = (frame % 100) / 100
-            conflict_idx = (frame // 100) % len(conflicts)
-            
-            # Update primary mission
-            points_to_show = int(len(primary_smooth_path) * base_progress)
-            if points_to_show > 0:
-                primary_path.set_data_3d(
-                    primary_smooth_path[:points_to_show, 0],
-                    primary_smooth_path[:points_to_show, 1],
-                    primary_smooth_path[:points_to_show, 2]
-                )
-                current_pos = primary_smooth_path[min(points_to_show - 1, len(primary_smooth_path) - 1)]
-                primary_drone._offsets3d = ([current_pos[0]], [current_pos[1]], [current_pos[2]])
-            artists.extend([primary_path, primary_drone])
-            
-            # Update resolved mission if available
-            if resolved_mission:
-                points_to_show = int(len(resolved_smooth_path) * base_progress)
-                if points_to_show > 0:
-                    resolved_path.set_data_3d(
-                        resolved_smooth_path[:points_to_show, 0],
-                        resolved_smooth_path[:points_to_show, 1],
-                        resolved_smooth_path[:points_to_show, 2]
-                    )
-                    current_pos = resolved_smooth_path[min(points_to_show - 1, len(resolved_smooth_path) - 1)]
-                    resolved_drone._offsets3d = ([current_pos[0]], [current_pos[1]], [current_pos[2]])
-                artists.extend([resolved_path, resolved_drone])
-            
-            # Update simulated flights
-            for (path, smooth_path), drone in zip(flight_paths, flight_drones):
-                points_to_show = int(len(smooth_path) * base_progress)
-                if points_to_show > 0:
-                    path.set_data_3d(
-                        smooth_path[:points_to_show, 0],
-                        smooth_path[:points_to_show, 1],
-                        smooth_path[:points_to_show, 2]
-                    )
-                    current_pos = smooth_path[min(points_to_show - 1, len(smooth_path) - 1)]
-                    drone._offsets3d = ([current_pos[0]], [current_pos[1]], [current_pos[2]])
-                artists.extend([path, drone])
-            
-            # Update conflict visualization
-            conflict = conflicts[conflict_idx]
-            location = eval(conflict['location'])
-            conflict_marker._offsets3d = ([location[0]], [location[1]], [location[2]])
-            size = 200 + 100 * np.sin(frame * 0.1)
-            conflict_marker.set_sizes([size])
-            artists.append(conflict_marker)
-            
-            time_text.set_text(f'Time: {conflict["time"]}\n'
-                              f'Flight: {conflict["involved_flights"][0]}\n')
-            artists.append(time_text)
-            
-            ax.view_init(elev=20, azim=frame % 360)
-            return artists
+            return _update_animation_frame(ax, artists, scene, frame, state)
 
-    # Assign the animation to the global variable
-    anim = FuncAnimation(fig, update, init_func=init, frames=range(1000), interval=50, blit=False)
+    # Assign the animation to the global variable; the rotating camera
+    # invalidates the whole view every frame, so blitting cannot help here
+    anim = FuncAnimation(fig, update, init_func=init, frames=range(len(scene['azimuth'])), interval=50, blit=False)
 
     plt.show()  # Show the animation
 
     # Keep the animation object in scope
-    return anim
\ No newline at end of file
+    return anim
+
+def _new_export_figure(size, dpi):
+    """Create a figure on the Agg canvas, so rendering never needs a display."""
+    fig = Figure(figsize=(size[0] / dpi, size[1] / dpi), dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111, projection='3d')
+    return fig, ax
+
+def _render_frame_chunk(scene, frames, size, dpi, frame_dir):
+    """Worker entry point: render a contiguous range of frames to numbered PNG files."""
+    fig, ax = _new_export_figure(size, dpi)
+    artists = _build_animation_artists(ax, scene)
+    fig.subplots_adjust(right=0.85)
+    state = {}
+    for frame in frames:
+        _update_animation_frame(ax, artists, scene, frame, state)
+        fig.savefig(os.path.join(frame_dir, f'frame_{frame:05d}.png'), dpi=dpi)
+    return len(frames)
+
+def _load_frames(frame_paths):
+    """Yield frames one at a time, closing each PNG file as soon as it is decoded."""
+    from PIL import Image
+    for path in frame_paths:
+        with Image.open(path) as image:
+            yield image.convert('RGB')
+
+def _encode_frames(frame_dir, num_frames, output_path, fps):
+    """Encode numbered PNG frames into a GIF (Pillow) or MP4 (ffmpeg) file."""
+    frame_paths = [os.path.join(frame_dir, f'frame_{frame:05d}.png') for frame in range(num_frames)]
+    if output_path.lower().endswith('.gif'):
+        frames = _load_frames(frame_paths)
+        first = next(frames)
+        first.save(output_path, save_all=True, append_images=frames, duration=int(1000 / fps), loop=0)
+    else:
+        subprocess.run([matplotlib.rcParams['animation.ffmpeg_path'], '-y', '-loglevel', 'error',
+                        '-framerate', str(fps), '-i', os.path.join(frame_dir, 'frame_%05d.png'),
+                        '-pix_fmt', 'yuv420p', output_path], check=True)
+
+def export_conflict_animation(conflicts, primary_mission, simulated_flights, output_path, resolved_mission=None,
+                              fps=20, size=(1280, 720), dpi=100, num_frames=1000, workers=1):
+    """
+    Render the conflict animation headlessly to an MP4 or GIF file.
+
+    Parameters:
+    output_path (str): Destination file; the extension (.mp4 or .gif) selects the encoder.
+    fps (int): Frame rate of the output.
+    size (tuple): Output resolution in pixels (width, height).
+    dpi (int): Render resolution; together with size it sets the figure size.
+    num_frames (int): Number of frames to render.
+    workers (int): Number of worker processes; frames are split into contiguous
+                   chunks, rendered to temporary PNG files and encoded in order.
+
+    Returns:
+    str: output_path, or None if there were no conflicts to render.
+    """
+    if not conflicts:
+        print("No conflicts to animate.")
+        return None
+    extension = os.path.splitext(output_path)[1].lower()
+    if extension not in ('.mp4', '.gif'):
+        raise ValueError(f"Unsupported animation format: {extension}")
+    if extension == '.mp4' and not animation.writers.is_available('ffmpeg'):
+        raise RuntimeError("ffmpeg is required to export MP4 animations")
+
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    debug_print(f"Exporting {num_frames} frames to {output_path} with {workers} worker(s)...")
+    scene = precompute_animation(conflicts, primary_mission, simulated_flights, resolved_mission, num_frames)
+
+    if workers <= 1:
+        fig, ax = _new_export_figure(size, dpi)
+        artists = _build_animation_artists(ax, scene)
+        fig.subplots_adjust(right=0.85)
+        writer = animation.PillowWriter(fps=fps) if extension == '.gif' else animation.FFMpegWriter(fps=fps)
+        state = {}
+        with writer.saving(fig, output_path, dpi):
+            for frame in range(num_frames):
+                _update_animation_frame(ax, artists, scene, frame, state)
+                writer.grab_frame()
+    else:
+        chunks = [chunk for chunk in np.array_split(np.arange(num_frames), workers) if len(chunk)]
+        with tempfile.TemporaryDirectory() as frame_dir:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(_render_frame_chunk, scene, chunk.tolist(), size, dpi, frame_dir)
+                           for chunk in chunks]
+                for future in futures:
+                    future.result()
+            _encode_frames(frame_dir, num_frames, output_path, fps)
+
+    debug_print(f"Animation saved to {output_path}")
+    return output_path
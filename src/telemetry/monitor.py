@@ -0,0 +1,303 @@
+import asyncio
+from collections import deque
+import json
+import math
+import os
+import time
+
+import numpy as np
+
+from deconfliction.fleet_index import find_close_pairs
+from deconfliction.time_normalization import parse_timestamp, format_time_range
+
+def parse_sample(line):
+    """
+    Parse one NDJSON telemetry line into a position sample.
+
+    Lines look like {"drone_id": "drone_1", "x": 1.0, "y": 2.0, "z": 50.0, "t": 1696154400.0};
+    an ISO 'timestamp' may be given instead of the epoch seconds in 't'.
+    Returns None for blank or malformed lines.
+    """
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        record = json.loads(line)
+        sample_time = record['t'] if 't' in record else parse_timestamp(record['timestamp'])
+        return {
+            'drone_id': str(record['drone_id']),
+            'x': float(record['x']), 'y': float(record['y']), 'z': float(record.get('z', 0)),
+            't': float(sample_time)
+        }
+    except (ValueError, KeyError, TypeError) as e:
+        print(f"Skipping malformed telemetry line: {line[:80]} ({e})")
+        return None
+
+async def stream_source(reader):
+    """Yield samples from an asyncio.StreamReader carrying NDJSON lines."""
+    while True:
+        line = await reader.readline()
+        if not line:
+            return
+        sample = parse_sample(line.decode('utf-8'))
+        if sample is not None:
+            yield sample
+
+async def file_source(path, follow=False, poll_interval=0.05):
+    """
+    Yield samples from an NDJSON file.
+
+    With follow=True the file is tailed like 'tail -f' and the source never ends.
+    """
+    with open(path, 'r') as file:
+        while True:
+            line = file.readline()
+            if line:
+                sample = parse_sample(line)
+                if sample is not None:
+                    yield sample
+            elif follow:
+                await asyncio.sleep(poll_interval)
+            else:
+                return
+
+async def socket_source(path):
+    """
+    Listen on a local Unix socket and yield samples from every connected client.
+
+    Clients write NDJSON lines; the source runs until it is cancelled.
+    """
+    queue = asyncio.Queue()
+
+    async def handle_client(reader, writer):
+        try:
+            async for sample in stream_source(reader):
+                await queue.put(sample)
+        except asyncio.CancelledError:
+            pass  # Server shutting down
+        finally:
+            writer.close()
+
+    if os.path.exists(path):
+        os.remove(path)
+    server = await asyncio.start_unix_server(handle_client, path=path)
+    try:
+        while True:
+            yield await queue.get()
+    finally:
+        server.close()
+        await server.wait_closed()
+
+class TelemetryMonitor:
+    """
+    Sliding-window separation monitor for live drone positions.
+
+    Each drone keeps a ring buffer of its most recent samples. On every tick the
+    latest positions are extrapolated linearly over a short horizon and each
+    step is checked with the grid-based find_close_pairs, so the cost per tick
+    grows with the number of drones, not the number of drone pairs.
+    """
+
+    def __init__(self, separation=2.0, horizon=5.0, horizon_steps=5, history=16, max_age=2.0,
+                 latency_budget=0.5):
+        self.separation = separation
+        self.horizon = horizon
+        self.horizon_steps = horizon_steps
+        self.history = history
+        self.max_age = max_age
+        self.latency_budget = latency_budget
+        self.tracks = {}  # drone_id -> deque of (t, x, y, z, received)
+        self.samples_ingested = 0
+        self.tracks_dropped = 0
+        self.ticks = 0
+        self.max_latency = 0.0
+        self._active_pairs = set()  # Pairs in conflict at the previous check of a run
+
+    def ingest(self, sample, received=None):
+        """Append a sample to its drone's ring buffer, recording when it arrived."""
+        track = self.tracks.get(sample['drone_id'])
+        if track is None:
+            track = self.tracks[sample['drone_id']] = deque(maxlen=self.history)
+        received = time.monotonic() if received is None else received
+        track.append((sample['t'], sample['x'], sample['y'], sample['z'], received))
+        self.samples_ingested += 1
+
+    def _snapshot(self, now):
+        """
+        Positions and velocities of every fresh track, propagated to a common reference time.
+
+        Drones report at different instants, so each latest sample is extrapolated
+        to the newest sample time before any positions are compared. Tracks with
+        no sample for max_age are dropped, so drones that have left do not cost
+        memory or time on later ticks; a drone that reports again starts a new track.
+
+        Returns:
+        tuple: (drone_ids, latest samples, velocities, positions at the reference time, reference time)
+        """
+        drone_ids, latest, previous = [], [], []
+        for drone_id, track in list(self.tracks.items()):
+            if now - track[-1][4] > self.max_age:
+                del self.tracks[drone_id]  # Stale track, the drone stopped reporting
+                self.tracks_dropped += 1
+                continue
+            drone_ids.append(drone_id)
+            latest.append(track[-1])
+            previous.append(track[-2] if len(track) > 1 else track[-1])
+        latest = np.array(latest, dtype=float).reshape(-1, 5)
+        previous = np.array(previous, dtype=float).reshape(-1, 5)
+        elapsed = latest[:, 0] - previous[:, 0]
+        velocities = np.zeros((len(latest), 3))
+        moving = elapsed > 0
+        velocities[moving] = (latest[moving, 1:4] - previous[moving, 1:4]) / elapsed[moving, None]
+        reference = float(latest[:, 0].max()) if len(latest) else 0.0
+        positions = latest[:, 1:4] + velocities * (reference - latest[:, 0])[:, None]
+        return drone_ids, latest, velocities, positions, reference
+
+    def check(self, now=None):
+        """
+        Run one separation check over current and extrapolated positions.
+
+        All tracks are first propagated to the newest sample time, and the horizon
+        from that time is split into horizon_steps intervals. For each interval
+        the grid check finds pairs that could get within separation during it
+        (the radius is widened by the fastest closing speed), and the exact
+        closest approach inside the interval is then computed for those pairs
+        only, so fast drones cannot pass through each other between steps.
+
+        Returns:
+        list: Alerts in the conflict format ('location', 'time', 'involved_flights',
+              'position', 'interval', 'separation') plus 'time_to_conflict' (seconds
+              of extrapolation, 0 for a current loss of separation) and 'latency'
+              (seconds from the newer sample's arrival to the alert).
+        """
+        now = time.monotonic() if now is None else now
+        self.ticks += 1
+        drone_ids, latest, velocities, current, reference = self._snapshot(now)
+        if len(drone_ids) < 2:
+            return []
+
+        steps = max(self.horizon_steps, 1)
+        step_length = self.horizon / steps
+        max_speed = np.sqrt((velocities ** 2).sum(axis=1)).max()
+        reach = self.separation + 2 * max_speed * step_length
+
+        alerted = set()
+        alerts = []
+        for step in range(steps):
+            start = step * step_length
+            positions = current + velocities * start
+            first, second, _ = find_close_pairs(positions, reach)
+
+            # Closest approach of each candidate pair within this interval
+            offset = positions[second] - positions[first]
+            closing = velocities[second] - velocities[first]
+            speed_squared = (closing ** 2).sum(axis=1)
+            tau = np.zeros(len(first))
+            moving = speed_squared > 0
+            tau[moving] = -(offset[moving] * closing[moving]).sum(axis=1) / speed_squared[moving]
+            tau = np.clip(tau, 0.0, step_length)
+            distances = np.sqrt(((offset + closing * tau[:, None]) ** 2).sum(axis=1))
+
+            for idx in np.flatnonzero(distances < self.separation):
+                pair = (int(first[idx]), int(second[idx]))
+                if pair in alerted:
+                    continue  # Already reported for an earlier interval
+                alerted.add(pair)
+                lookahead = float(start + tau[idx])
+                predicted_time = reference + lookahead
+                position = tuple(float(v) for v in current[pair[0]] + velocities[pair[0]] * lookahead)
+                alerts.append({
+                    'location': f"({position[0]:.1f}, {position[1]:.1f}, {position[2]:.1f})",
+                    'time': format_time_range(predicted_time, predicted_time),
+                    'involved_flights': [drone_ids[pair[0]], drone_ids[pair[1]]],
+                    'position': position,
+                    'interval': (predicted_time, predicted_time),
+                    'separation': float(distances[idx]),
+                    'time_to_conflict': lookahead,
+                    'latency': float(now - max(latest[pair[0], 4], latest[pair[1], 4]))
+                })
+        return alerts
+
+    def _new_alerts(self, alerts):
+        """Keep alerts for pairs that were not already conflicting at the previous check."""
+        current_pairs = {tuple(sorted(alert['involved_flights'])) for alert in alerts}
+        fresh = [alert for alert in alerts if tuple(sorted(alert['involved_flights'])) not in self._active_pairs]
+        self._active_pairs = current_pairs
+        return fresh
+
+    async def _emit(self, alerts, on_alert, started=None):
+        """Pass alerts to on_alert, adding the time spent since started (wall clock) to their latency."""
+        for alert in alerts:
+            if started is not None:
+                alert['latency'] += time.monotonic() - started
+            self.max_latency = max(self.max_latency, alert['latency'])
+            result = on_alert(alert)
+            if asyncio.iscoroutine(result):
+                await result
+
+    async def run(self, source, on_alert=print, tick_interval=0.2):
+        """
+        Ingest samples from an async source and check separation every tick.
+
+        Ingestion runs as its own task and fills the ring buffers between ticks,
+        so the check always sees the newest samples. A pair is alerted once when
+        it starts conflicting and again only after it has cleared. Alerts are
+        passed to on_alert with their latency finalized at emission; ticks over
+        latency_budget are reported. Returns when the source is exhausted, after
+        one final check.
+        """
+        async def ingest_all():
+            async for sample in source:
+                self.ingest(sample)
+
+        self._active_pairs = set()
+        ingest_task = asyncio.create_task(ingest_all())
+        try:
+            while not ingest_task.done():
+                await asyncio.wait({ingest_task}, timeout=tick_interval)
+                started = time.monotonic()
+                await self._emit(self._new_alerts(self.check(started)), on_alert, started)
+                tick_duration = time.monotonic() - started
+                if tick_duration > self.latency_budget:
+                    print(f"Telemetry tick took {tick_duration:.3f}s for {len(self.tracks)} drones, "
+                          f"over the {self.latency_budget}s latency budget")
+            ingest_task.result()  # Surface errors from the source
+        finally:
+            ingest_task.cancel()
+
+    async def run_recorded(self, source, on_alert=print, tick_interval=0.2):
+        """
+        Check recorded samples on the recording's own clock instead of the wall clock.
+
+        A check runs every tick_interval seconds of sample time, after all samples
+        up to that time have been ingested, so the alerts do not depend on how
+        fast the recording is played back. Track staleness and alert latency are
+        measured in sample time as well. Stretches where every track is stale
+        are skipped.
+        """
+        self._active_pairs = set()
+        next_tick = newest = None
+        async for sample in source:
+            if next_tick is None:
+                next_tick = sample['t'] + tick_interval
+            while sample['t'] > next_tick:
+                if next_tick - newest > self.max_age:
+                    # Nothing to check until this sample arrives
+                    next_tick += math.ceil((sample['t'] - next_tick) / tick_interval) * tick_interval
+                    break
+                await self._emit(self._new_alerts(self.check(next_tick)), on_alert)
+                next_tick += tick_interval
+            self.ingest(sample, received=sample['t'])
+            newest = sample['t'] if newest is None else max(newest, sample['t'])
+        if next_tick is not None:
+            await self._emit(self._new_alerts(self.check(next_tick)), on_alert)
+
+    def stats(self):
+        """Monitoring counters: tracked and dropped drones, ingested samples, ticks and worst alert latency."""
+        return {
+            'drones': len(self.tracks),
+            'dropped': self.tracks_dropped,
+            'samples': self.samples_ingested,
+            'ticks': self.ticks,
+            'max_latency': self.max_latency
+        }
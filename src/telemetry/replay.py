@@ -0,0 +1,60 @@
+import argparse
+import asyncio
+import json
+
+from telemetry.monitor import TelemetryMonitor, parse_sample
+
+async def replay_source(path, speed=1.0):
+    """
+    Yield recorded telemetry samples, pacing them by their recorded timestamps.
+
+    Pacing only affects how fast the recording plays; replay() checks separation
+    on the recorded clock, so the alerts are the same at any speed.
+
+    Parameters:
+    path (str): NDJSON recording, one sample per line, ordered by time.
+    speed (float): Playback speed multiplier; 0 replays as fast as possible.
+    """
+    previous_time = None
+    with open(path, 'r') as file:
+        for line in file:
+            sample = parse_sample(line)
+            if sample is None:
+                continue
+            if speed > 0 and previous_time is not None and sample['t'] > previous_time:
+                await asyncio.sleep((sample['t'] - previous_time) / speed)
+            previous_time = sample['t']
+            yield sample
+
+async def replay(path, speed=1.0, tick_interval=0.2, **monitor_options):
+    """
+    Feed a recording through a TelemetryMonitor offline and collect its alerts.
+
+    Separation is checked every tick_interval seconds of recorded time, so an
+    unpaced replay (speed=0) sees every moment of the recording.
+
+    Returns:
+    tuple: (alerts, monitor stats)
+    """
+    monitor = TelemetryMonitor(**monitor_options)
+    alerts = []
+    await monitor.run_recorded(replay_source(path, speed), on_alert=alerts.append, tick_interval=tick_interval)
+    return alerts, monitor.stats()
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded drone telemetry through the separation monitor.")
+    parser.add_argument('recording', help="NDJSON file with one position sample per line")
+    parser.add_argument('--speed', type=float, default=1.0, help="playback speed multiplier, 0 for unpaced")
+    parser.add_argument('--tick', type=float, default=0.2, help="seconds of recorded time between separation checks")
+    parser.add_argument('--separation', type=float, default=2.0, help="minimum separation distance")
+    parser.add_argument('--horizon', type=float, default=5.0, help="extrapolation horizon in seconds")
+    args = parser.parse_args()
+
+    alerts, stats = asyncio.run(replay(args.recording, args.speed, args.tick,
+                                       separation=args.separation, horizon=args.horizon))
+    for alert in alerts:
+        print(json.dumps(alert))
+    print(f"\n{len(alerts)} alerts, {stats}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The simulation and telemetry packages import their siblings as top-level
+# packages (as when running src/main.py), so src must be importable directly.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
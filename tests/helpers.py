@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+
+from src.deconfliction.time_normalization import format_time_range
+
+def timed(points, start="2023-10-01T10:00:00Z", step=600):
+    """Pair (x, y, z) points with ISO timestamps step seconds apart, starting at start."""
+    first = datetime.fromisoformat(start.replace("Z", "+00:00"))
+    return [((first + timedelta(seconds=idx * step)).strftime("%Y-%m-%dT%H:%M:%SZ"), point)
+            for idx, point in enumerate(points)]
+
+def untimed(points):
+    """Pair (x, y, z) points with no time, for tests that only need geometry."""
+    return [(None, point) for point in points]
+
+def make_flight(drone_id, points, start=None, end=None, **fields):
+    """
+    Build a flight dict from (time, (x, y, z)) points.
+
+    A point's time may be an ISO timestamp (stored as 'timestamp'), a number
+    (a relative 'time') or None (no time). The time window defaults to the
+    first and last timestamps; a drone_id of None leaves the key out, as in
+    primary missions. Extra fields (mission_id, priority, ...) are copied in.
+    """
+    waypoints = []
+    for time, (x, y, z) in points:
+        waypoint = {"x": x, "y": y, "z": z}
+        if isinstance(time, str):
+            waypoint["timestamp"] = time
+        elif time is not None:
+            waypoint["time"] = time
+        waypoints.append(waypoint)
+    flight = {"waypoints": waypoints}
+    if drone_id is not None:
+        flight["drone_id"] = drone_id
+    timestamps = [time for time, _ in points if isinstance(time, str)]
+    start = start if start is not None else (timestamps[0] if timestamps else None)
+    end = end if end is not None else (timestamps[-1] if timestamps else None)
+    if start is not None:
+        flight["time_window"] = {"start": start, "end": end}
+    flight.update(fields)
+    return flight
+
+def make_mission(points, start=None, end=None, **fields):
+    """Build a primary mission dict (no drone_id) from (time, (x, y, z)) points; see make_flight."""
+    return make_flight(None, points, start, end, **fields)
+
+def make_conflict(flights, position=(1.0, 2.0, 50.0), interval=None, separation=1.0):
+    """Build a conflict dict in the detectors' format."""
+    return {
+        'location': str(position),
+        'time': format_time_range(*interval) if interval else None,
+        'involved_flights': list(flights),
+        'position': position,
+        'interval': interval,
+        'separation': separation
+    }
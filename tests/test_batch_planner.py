@@ -0,0 +1,109 @@
+import unittest
+import numpy as np
+from deconfliction.occupancy_grid import OccupancyGrid
+from simulation.simulator import run_simulation
+from simulation.batch_planner import order_missions, plan_region, partition_regions, plan_missions
+from helpers import make_flight, make_mission, timed
+
+def hourly(points, hour=10):
+    return timed(points, start=f"2023-10-01T{hour:02d}:00:00Z")
+
+def planned(mission_id, points, hour=10, priority=0, filed_at=None):
+    fields = {"filed_at": filed_at} if filed_at else {}
+    return make_mission(hourly(points, hour), end=f"2023-10-01T{hour:02d}:50:00Z",
+                        mission_id=mission_id, priority=priority, **fields)
+
+def scheduled(drone_id, points):
+    return make_flight(drone_id, hourly(points), end="2023-10-01T10:50:00Z")
+
+TRACK = [(0, 0, 50), (10, 0, 50), (20, 0, 50)]
+
+def shift_east(mission, conflicts):
+    # Top level so the parallel planner can pickle it
+    return dict(mission, waypoints=[dict(waypoint, x=waypoint["x"] + 500) for waypoint in mission["waypoints"]])
+
+class TestBatchPlanner(unittest.TestCase):
+
+    def test_order_missions_by_priority_then_filing_time(self):
+        missions = [
+            planned("late", TRACK, priority=1, filed_at="2023-10-01T09:00:00Z"),
+            planned("unfiled", TRACK, priority=1),
+            planned("early", TRACK, priority=1, filed_at="2023-10-01T08:00:00Z"),
+            planned("urgent", TRACK, priority=5),
+        ]
+        self.assertEqual([m["mission_id"] for m in order_missions(missions)], ["urgent", "early", "late", "unfiled"])
+
+    def test_accepted_missions_block_later_ones(self):
+        missions = [planned("a", TRACK, priority=2), planned("b", TRACK, priority=1),
+                    planned("c", [(0, 100, 50), (10, 100, 50)])]
+        result = plan_region(missions, {"flights": []})
+        self.assertEqual([entry["mission_id"] for entry in result["accepted"]], ["a", "c"])
+        self.assertEqual([entry["mission_id"] for entry in result["rejected"]], ["b"])
+        self.assertTrue(result["rejected"][0]["conflicts"])
+
+    def test_resolved_missions_are_rechecked(self):
+        schedule = {"flights": [scheduled("d1", TRACK)]}
+        moved = lambda mission, conflicts: planned(mission["mission_id"], [(x, y + 30, z) for x, y, z in TRACK])
+        unchanged = lambda mission, conflicts: mission
+        accepted = plan_region([planned("a", TRACK)], schedule, resolver=moved)["accepted"]
+        self.assertTrue(accepted[0]["resolved"])
+        self.assertEqual(plan_region([planned("a", TRACK)], schedule, resolver=unchanged)["accepted"], [])
+
+    def test_screen_never_discards_a_valid_resolution(self):
+        # The resolution runs parallel to d1, 7 m away: in the same grid cells but outside the buffer
+        schedule = {"flights": [scheduled("d1", [(x, 12, z) for x, _, z in TRACK]),
+                                scheduled("d2", TRACK)]}
+        moved = lambda mission, conflicts: planned(mission["mission_id"], [(x, 19, z) for x, _, z in TRACK])
+        for screen in (False, True):
+            result = plan_region([planned("a", TRACK), planned("far", [(500, 500, 50)])], schedule,
+                                 resolver=moved, screen=screen)
+            self.assertEqual([entry["mission_id"] for entry in result["accepted"]], ["a", "far"])
+
+    def test_provably_clear_agrees_with_full_check(self):
+        rng = np.random.default_rng(5)
+        schedule = {"flights": [scheduled(f"d{i}", rng.uniform(0, 200, size=(3, 3)).tolist()) for i in range(8)]}
+        grid = OccupancyGrid.from_schedule(schedule)
+        screened = 0
+        for i in range(60):
+            mission = planned(f"m{i}", rng.uniform(0, 200, size=(3, 3)).tolist(), hour=int(rng.integers(8, 16)))
+            if grid.provably_clear(mission, 2.0):
+                screened += 1
+                self.assertEqual(run_simulation(mission, schedule, mode='query'), [])
+        self.assertGreater(screened, 0)
+
+    def test_partition_ignores_time(self):
+        missions = [planned("morning", TRACK, hour=8), planned("afternoon", TRACK, hour=14),
+                    planned("far", [(1000, 1000, 50), (1010, 1000, 50)])]
+        regions = partition_regions(missions)
+        self.assertEqual(sorted(sorted(m["mission_id"] for m in region) for region in regions),
+                         [["afternoon", "morning"], ["far"]])
+
+    def test_parallel_planning_matches_serial(self):
+        missions = [planned("a", TRACK, hour=8, priority=3), planned("b", TRACK, hour=14, priority=2),
+                    planned("c", [(1000, 0, 50), (1010, 0, 50)], priority=1),
+                    planned("d", [(1010, 0.5, 50), (1020, 1, 50)]),
+                    planned("e", [(-500, -500, 80), (-490, -500, 80)])]
+        schedule = {"flights": [scheduled("d1", [(-490, -501, 80)])]}
+        serial = plan_missions(missions, schedule, workers=1)
+        parallel = plan_missions(missions, schedule, workers=2)
+        summary = lambda report: ([e["mission_id"] for e in report["accepted"]],
+                                  [e["mission_id"] for e in report["rejected"]])
+        self.assertEqual(summary(serial), (["a", "c"], ["b", "d", "e"]))
+        self.assertEqual(summary(parallel), summary(serial))
+        self.assertEqual(parallel["regions"], 3)
+
+    def test_parallel_resolutions_are_rechecked_across_regions(self):
+        # The resolver moves "near" off d1's track straight onto "far", which is in another region
+        missions = [planned("far", [(x + 500, y, z) for x, y, z in TRACK], priority=1), planned("near", TRACK)]
+        schedule = {"flights": [scheduled("d1", TRACK)]}
+        summary = lambda report: ([e["mission_id"] for e in report["accepted"]],
+                                  [e["mission_id"] for e in report["rejected"]])
+        serial = plan_missions(missions, schedule, resolver=shift_east, workers=1)
+        parallel = plan_missions(missions, schedule, resolver=shift_east, workers=2)
+        self.assertEqual(parallel["regions"], 2)
+        self.assertEqual(summary(serial), (["far"], ["near"]))
+        self.assertEqual(summary(parallel), summary(serial))
+        self.assertTrue(parallel["rejected"][0]["conflicts"])
+
+if __name__ == '__main__':
+    unittest.main()
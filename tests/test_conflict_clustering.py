@@ -0,0 +1,53 @@
+import unittest
+from src.deconfliction.conflict_clustering import cluster_conflicts
+from helpers import make_conflict
+
+class TestConflictClustering(unittest.TestCase):
+
+    def test_adjacent_conflicts_merge_into_one_episode(self):
+        conflicts = [
+            make_conflict(['primary', 'drone_1'], (0.0, 0.0, 10.0), (0.0, 60.0), 1.5),
+            make_conflict(['drone_1', 'primary'], (3.0, 4.0, 10.0), (60.0, 120.0), 0.5),
+            make_conflict(['primary', 'drone_1'], (6.0, 8.0, 10.0), (120.0, 180.0), 1.0),
+        ]
+        episodes = cluster_conflicts(conflicts)
+        self.assertEqual(len(episodes), 1)
+        episode = episodes[0]
+        self.assertEqual(episode['conflict_count'], 3)
+        self.assertEqual((episode['entry_time'], episode['exit_time']), (0.0, 180.0))
+        self.assertEqual(episode['min_separation'], 0.5)
+        self.assertEqual(episode['position'], (3.0, 4.0, 10.0))
+        self.assertIsNotNone(episode['time'])
+
+    def test_time_and_space_gaps_split_episodes(self):
+        conflicts = [
+            make_conflict(['primary', 'drone_1'], (0.0, 0.0, 10.0), (0.0, 60.0), 1.0),
+            make_conflict(['primary', 'drone_1'], (1.0, 0.0, 10.0), (5000.0, 5060.0), 1.0),
+            make_conflict(['primary', 'drone_1'], (90.0, 0.0, 10.0), (5060.0, 5120.0), 1.0),
+        ]
+        self.assertEqual(len(cluster_conflicts(conflicts)), 3)
+
+    def test_pairs_are_kept_apart(self):
+        conflicts = [
+            make_conflict(['primary', 'drone_1'], (0.0, 0.0, 10.0), (0.0, 10000.0), 1.0),
+            make_conflict(['primary', 'drone_2'], (0.0, 0.0, 10.0), (100.0, 160.0), 1.0),
+            make_conflict(['primary', 'drone_2'], (1.0, 0.0, 10.0), (3000.0, 3060.0), 1.0),
+        ]
+        episodes = cluster_conflicts(conflicts)
+        self.assertEqual([e['involved_flights'][1] for e in episodes], ['drone_1', 'drone_2', 'drone_2'])
+
+    def test_untimed_conflicts(self):
+        conflicts = [
+            make_conflict(['primary', 'drone_1'], (0.0, 0.0, 10.0), None, None),
+            make_conflict(['primary', 'drone_1'], (1.0, 0.0, 10.0), None, None),
+        ]
+        episodes = cluster_conflicts(conflicts)
+        self.assertEqual(len(episodes), 1)
+        self.assertIsNone(episodes[0]['time'])
+        self.assertIsNone(episodes[0]['min_separation'])
+
+    def test_no_conflicts(self):
+        self.assertEqual(cluster_conflicts([]), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import numpy as np
+from src.deconfliction.conflict_probability import estimate_conflict_probabilities
+from helpers import make_flight, make_mission
+
+WINDOW = ("2023-10-01T10:00:00Z", "2023-10-01T10:10:00Z")
+
+class TestConflictProbability(unittest.TestCase):
+
+    def setUp(self):
+        # Primary flies east along y=0 from 10:00 to 10:10
+        self.primary_mission = make_mission([
+            ("2023-10-01T10:00:00Z", (0.0, 0.0, 50.0)),
+            ("2023-10-01T10:10:00Z", (600.0, 0.0, 50.0)),
+        ])
+
+    def test_head_on_encounter_is_certain(self):
+        schedule = {"flights": [make_flight("drone_1", [(0, (600.0, 0.0, 50.0)), (1, (0.0, 0.0, 50.0))], *WINDOW)]}
+        results = estimate_conflict_probabilities(self.primary_mission, schedule, gps_sigma=0.1,
+                                                  timing_jitter=1.0, samples=500, seed=0)
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]["involved_flights"], ["primary", "drone_1"])
+        self.assertGreater(results[0]["probability"], 0.99)
+
+    def test_uncertainty_raises_near_miss_probability(self):
+        # Same path shifted 3 m sideways: clear of a 2 m buffer only without drift
+        schedule = {"flights": [make_flight("drone_1", [(0, (0.0, 3.0, 50.0)), (1, (600.0, 3.0, 50.0))], *WINDOW)]}
+        precise = estimate_conflict_probabilities(self.primary_mission, schedule, gps_sigma=0.2,
+                                                  timing_jitter=0.0, samples=500, seed=0)
+        noisy = estimate_conflict_probabilities(self.primary_mission, schedule, gps_sigma=1.2,
+                                                timing_jitter=0.0, samples=500, seed=0)
+        self.assertLess(precise[0]["probability"], 0.01)
+        self.assertGreater(noisy[0]["probability"], 0.03)
+
+    def test_crossing_between_waypoints_is_found(self):
+        # Meets the primary at (300, 0) at 10:05, far from either flight's waypoints
+        crossing = make_flight("drone_1", [(0, (300.0, -300.0, 50.0)), (1, (300.0, 300.0, 50.0))], *WINDOW)
+        schedule = {"flights": [crossing]}
+        results = estimate_conflict_probabilities(self.primary_mission, schedule, gps_sigma=0.1,
+                                                  timing_jitter=0.0, samples=200, seed=0)
+        self.assertEqual(len(results), 1)
+        self.assertGreater(results[0]["probability"], 0.99)
+        self.assertEqual(results[0]["time"], "2023-10-01 10:05:00 to 2023-10-01 10:05:00")
+
+    def test_fast_encounter_keeps_full_resolution(self):
+        # Head-on at 10 m/s each over 10 minutes: a coarse grid would step over the meeting point
+        primary = make_mission([("2023-10-01T10:00:00Z", (0.0, 0.0, 50.0)),
+                                ("2023-10-01T10:10:00Z", (6000.0, 0.0, 50.0))])
+        schedule = {"flights": [make_flight("drone_1", [(0, (6000.0, 0.0, 50.0)), (1, (0.0, 0.0, 50.0))], *WINDOW)]}
+        results = estimate_conflict_probabilities(primary, schedule, gps_sigma=0.1, timing_jitter=1.0,
+                                                  samples=500, seed=0)
+        self.assertGreater(results[0]["probability"], 0.99)
+        self.assertLess(results[0]["separation"], 1.0)
+        self.assertAlmostEqual(results[0]["position"][0], 3000.0, delta=1.0)
+
+    def test_hour_long_head_on_matches_drift_distribution(self):
+        # Head-on at 15 m/s for an hour: timing slip only moves the meeting point, so a
+        # conflict depends on the sideways drift alone, Rayleigh with sigma sqrt(2)
+        primary = make_mission([("2023-10-01T10:00:00Z", (0.0, 0.0, 50.0)),
+                                ("2023-10-01T11:00:00Z", (54000.0, 0.0, 50.0))])
+        schedule = {"flights": [make_flight("drone_1", [("2023-10-01T10:00:00Z", (54000.0, 0.0, 50.0)),
+                                                        ("2023-10-01T11:00:00Z", (0.0, 0.0, 50.0))])]}
+        result = estimate_conflict_probabilities(primary, schedule, samples=4000, seed=0)[0]
+        self.assertAlmostEqual(result["probability"], 1 - np.exp(-1), delta=4 * result["std_error"])
+        self.assertEqual(result["separation"], 0.0)
+        self.assertEqual(result["time"], "2023-10-01 10:30:00 to 2023-10-01 10:30:00")
+
+    def test_distant_flights_skip_sampling(self):
+        schedule = {"flights": [make_flight("drone_1", [(0, (0.0, 500.0, 50.0)), (1, (600.0, 500.0, 50.0))], *WINDOW)]}
+        self.assertEqual(estimate_conflict_probabilities(self.primary_mission, schedule, seed=0), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from src.deconfliction.conflict_explanation import explain_conflicts, iter_explanations
+from src.deconfliction.conflict_sinks import NDJSONSink, SummarySink, stream_conflicts
+from helpers import make_conflict
+
+INTERVAL = (1696154400.0, 1696154460.0)  # 2023-10-01 10:00 to 10:01
+
+class TestConflictSinks(unittest.TestCase):
+
+    def setUp(self):
+        self.conflicts = [
+            make_conflict(("primary", "drone_1"), interval=INTERVAL, separation=1.5),
+            make_conflict(("drone_1", "primary"), interval=(1696154300.0, 1696154500.0), separation=0.5),
+            make_conflict(("drone_2", "drone_3"), separation=1.0),
+        ]
+
+    def test_ndjson_records_include_explanations(self):
+        output = io.StringIO()
+        count = stream_conflicts(iter(self.conflicts), NDJSONSink(output))
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(count, 3)
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records[0]['involved_flights'], ["primary", "drone_1"])
+        self.assertEqual(records[0]['position'], [1.0, 2.0, 50.0])
+        self.assertEqual([r['explanation'] for r in records], explain_conflicts(self.conflicts))
+
+    def test_ndjson_file_output(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "conflicts.ndjson")
+            with NDJSONSink(path, explain=False) as sink:
+                stream_conflicts(self.conflicts, sink)
+            with open(path) as file:
+                records = [json.loads(line) for line in file]
+        self.assertEqual(len(records), 3)
+        self.assertNotIn('explanation', records[0])
+
+    def test_summary_aggregates_without_keeping_conflicts(self):
+        summary_sink = SummarySink(top_n=2)
+        stream_conflicts((conflict for conflict in self.conflicts), summary_sink)
+        summary = summary_sink.summary()
+        self.assertEqual(summary['conflicts'], 3)
+        self.assertEqual(summary['untimed'], 1)
+        self.assertEqual(summary['pairs'], 2)
+        self.assertEqual(summary['min_separation'], 0.5)
+        self.assertEqual(summary['time'], "2023-10-01 09:58:20 to 2023-10-01 10:01:40")
+        self.assertEqual(summary['busiest_pairs'][0], (("drone_1", "primary"), 2))
+        self.assertEqual([c['separation'] for c in summary['closest']], [0.5, 1.0])
+
+    def test_empty_stream(self):
+        summary = SummarySink()
+        self.assertEqual(stream_conflicts([], summary), 0)
+        self.assertIsNone(summary.summary()['min_separation'])
+        self.assertIsNone(summary.summary()['time'])
+
+    def test_conflicts_without_separation(self):
+        summary = SummarySink()
+        self.assertEqual(stream_conflicts([make_conflict(["primary", "drone_1"], separation=None)], summary), 1)
+        self.assertIsNone(summary.summary()['min_separation'])
+        self.assertEqual(summary.summary()['closest'], [])
+        json.dumps(summary.summary(), allow_nan=False)
+
+    def test_iter_explanations_is_lazy(self):
+        explanations = iter_explanations(make_conflict(("a", "b"), interval=INTERVAL) for _ in range(3))
+        self.assertEqual(next(explanations),
+                         "Conflict detected at location (1.0, 2.0, 50.0) during time "
+                         "2023-10-01 10:00:00 to 2023-10-01 10:01:00. Involved flights: a, b.")
+
+if __name__ == '__main__':
+    unittest.main()
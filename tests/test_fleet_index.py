@@ -0,0 +1,68 @@
+import unittest
+import numpy as np
+from src.deconfliction.fleet_index import FleetIndex, iter_flight_pairs
+from src.deconfliction.spatial_check import check_spatial_conflict, iter_spatial_conflicts
+from src.deconfliction.temporal_check import check_temporal_conflict, iter_temporal_conflicts
+from helpers import make_flight
+
+START, END = "2023-10-01T10:00:00Z", "2023-10-01T10:30:00Z"
+
+class TestFleetIndex(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.schedule = {"flights": [
+            make_flight(f"drone_{i}", list(enumerate(rng.uniform(0, 20, size=(5, 3)).round(2).tolist())), START, END)
+            for i in range(20)
+        ]}
+        self.primary_mission = {
+            "waypoints": [{"x": x, "y": y, "z": z, "timestamp": f"2023-10-01T10:{i:02d}:00Z"}
+                          for i, (x, y, z) in enumerate(rng.uniform(0, 20, size=(6, 3)).round(2).tolist())],
+            "time_window": {"start": "2023-10-01T10:00:00Z", "end": "2023-10-01T10:15:00Z"}
+        }
+
+    def test_query_matches_brute_force(self):
+        index = FleetIndex.from_schedule(self.schedule, cell_size=1.5)
+        point = (10.0, 10.0, 10.0)
+        expected = set()
+        for flight_idx, flight in enumerate(index.flights):
+            for wp_idx, position in enumerate(flight["positions"]):
+                if np.linalg.norm(position - point) < 4.0:
+                    expected.add((flight_idx, wp_idx))
+        hits = {(flight_idx, wp_idx) for flight_idx, wp_idx, _ in index.query(point, 4.0)}
+        self.assertEqual(hits, expected)
+
+    def test_query_mode_matches_audit_for_primary_pairs(self):
+        for check, buffer in ((check_spatial_conflict, 6.0), (check_temporal_conflict, 4.0)):
+            audit = check(self.primary_mission, self.schedule, buffer)
+            query = check(self.primary_mission, self.schedule, buffer, mode='query')
+            expected = [c for c in audit if c["involved_flights"][0] == "primary"]
+            self.assertTrue(query)
+            self.assertEqual(len(query), len(expected))
+            for found, wanted in zip(query, expected):
+                self.assertAlmostEqual(found.pop("separation"), wanted.pop("separation"))
+                self.assertEqual(found, wanted)
+
+    def test_nearest_first_yields_same_conflicts_closest_first(self):
+        for iterate, buffer in ((iter_spatial_conflicts, 6.0), (iter_temporal_conflicts, 4.0)):
+            for mode in ('audit', 'query'):
+                ordered = list(iterate(self.primary_mission, self.schedule, buffer, mode=mode))
+                nearest = list(iterate(self.primary_mission, self.schedule, buffer, mode=mode, nearest_first=True))
+                key = lambda c: (c["location"], tuple(c["involved_flights"]))
+                self.assertEqual(sorted(map(key, nearest)), sorted(map(key, ordered)))
+            first = next(iterate(self.primary_mission, self.schedule, buffer, mode='query', nearest_first=True))
+            self.assertEqual(first["separation"],
+                             min(c["separation"] for c in ordered if c["position"] == first["position"]))
+
+    def test_flight_pairs_are_generated_lazily(self):
+        flights = list(range(2000))
+        pairs = iter_flight_pairs(flights)
+        self.assertEqual([next(pairs) for _ in range(3)], [(0, 1), (0, 2), (0, 3)])
+        self.assertEqual(sum(1 for _ in iter_flight_pairs(flights[:5])), 10)
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            check_spatial_conflict(self.primary_mission, self.schedule, mode='bogus')
+
+if __name__ == '__main__':
+    unittest.main()
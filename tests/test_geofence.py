@@ -0,0 +1,52 @@
+import unittest
+import numpy as np
+from src.deconfliction.geofence import GeofenceIndex, check_geofence_violations
+from helpers import make_mission
+
+class TestGeofence(unittest.TestCase):
+
+    def setUp(self):
+        self.zones = [
+            {"zone_id": "stadium", "type": "cylinder", "center": [50, 0], "radius": 10, "floor": 0, "ceiling": 100},
+            {"zone_id": "evening_tfr", "type": "polygon", "vertices": [[80, -5], [90, -5], [90, 5], [80, 5]],
+             "floor": 0, "ceiling": 100,
+             "active": {"start": "2023-10-01T18:00:00Z", "end": "2023-10-01T20:00:00Z"}},
+            {"zone_id": "high_corridor", "type": "cylinder", "center": [20, 0], "radius": 10,
+             "floor": 200, "ceiling": 300},
+        ]
+        self.mission = make_mission([
+            ("2023-10-01T10:00:00Z", (0.0, 0.0, 50.0)),
+            ("2023-10-01T10:10:00Z", (100.0, 0.0, 50.0)),
+        ])
+
+    def test_violation_reported_in_conflict_format(self):
+        violations = check_geofence_violations(self.mission, GeofenceIndex(self.zones))
+        self.assertEqual([v["zone_id"] for v in violations], ["stadium"])
+        violation = violations[0]
+        self.assertEqual(violation["involved_flights"], ["primary", "stadium"])
+        self.assertEqual(violation["position"], (40.0, 0.0, 50.0))
+        self.assertEqual(violation["time"], "2023-10-01 10:04:00 to 2023-10-01 10:04:00")
+
+    def test_active_window_and_altitude_band(self):
+        self.zones[1]["active"] = {"start": "2023-10-01T10:00:00Z", "end": "2023-10-01T11:00:00Z"}
+        self.zones[2]["floor"] = 0
+        violations = check_geofence_violations(self.mission, GeofenceIndex(self.zones))
+        self.assertEqual(sorted(v["zone_id"] for v in violations), ["evening_tfr", "high_corridor", "stadium"])
+
+    def test_rtree_query_matches_brute_force(self):
+        rng = np.random.default_rng(0)
+        zones = [{"zone_id": f"zone_{i}", "type": "cylinder", "center": rng.uniform(0, 1000, 2).tolist(),
+                  "radius": float(rng.uniform(1, 20)), "floor": 0, "ceiling": 100} for i in range(500)]
+        index = GeofenceIndex(zones, node_capacity=8)
+        low, high = np.array([200.0, 300.0, 10.0]), np.array([400.0, 450.0, 20.0])
+        expected = {z["zone_id"] for z in zones
+                    if (np.array(z["center"]) - z["radius"] <= high[:2]).all()
+                    and (np.array(z["center"]) + z["radius"] >= low[:2]).all()}
+        self.assertEqual({z["zone_id"] for z in index.query(low, high)}, expected)
+
+    def test_unknown_zone_type(self):
+        with self.assertRaises(ValueError):
+            GeofenceIndex([{"zone_id": "bad", "type": "sphere"}])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+from unittest import mock
+from src.deconfliction.occupancy_grid import OccupancyGrid
+from src.deconfliction.time_normalization import normalize_flight, parse_timestamp
+from helpers import make_flight
+
+class TestOccupancyGrid(unittest.TestCase):
+
+    def setUp(self):
+        self.schedule = {"flights": [
+            make_flight("drone_1", [("2023-10-01T10:00:00Z", (0.0, 0.0, 50.0)),
+                                    ("2023-10-01T10:05:00Z", (100.0, 0.0, 50.0))]),
+            make_flight("drone_2", [("2023-10-01T10:00:00Z", (0.0, 50.0, 50.0)),
+                                    ("2023-10-01T10:05:00Z", (100.0, 50.0, 50.0))]),
+        ]}
+        self.grid = OccupancyGrid.from_schedule(self.schedule)
+        # Crosses drone_1's corridor at the same time and altitude
+        self.mission = make_flight("primary", [("2023-10-01T10:00:00Z", (50.0, -50.0, 50.0)),
+                                               ("2023-10-01T10:05:00Z", (50.0, 30.0, 50.0))])
+
+    def test_rasterize_covers_every_cell_along_the_leg(self):
+        cells = self.grid.rasterize(normalize_flight(self.schedule["flights"][0]))
+        self.assertEqual(sorted(set(cells[:, 0].tolist())), list(range(11)))
+        self.assertEqual(set(cells[:, 2].tolist()), {5})
+        self.assertEqual(len(set(cells[:, 3].tolist())), 6)
+
+    def test_screen_is_time_aware(self):
+        self.assertFalse(self.grid.is_free(self.mission))
+        later = make_flight("primary", [("2023-10-01T11:00:00Z", (50.0, -50.0, 50.0)),
+                                        ("2023-10-01T11:05:00Z", (50.0, 30.0, 50.0))])
+        self.assertTrue(self.grid.is_free(later))
+
+    def test_incremental_updates(self):
+        self.grid.remove_flight("drone_1")
+        self.assertTrue(self.grid.is_free(self.mission))
+        self.grid.add_flight(normalize_flight(self.schedule["flights"][0]))
+        self.grid.add_flight(normalize_flight(self.schedule["flights"][0]))  # Re-adding replaces
+        self.assertEqual(len(self.grid), 2)
+        self.assertEqual(max(self.grid.counts.values()), 1)
+
+    def test_provably_clear_is_conservative(self):
+        self.assertFalse(self.grid.provably_clear(self.mission, 2.0))
+        parallel = make_flight("primary", [("2023-10-01T12:00:00Z", (0.0, 7.0, 50.0)),
+                                           ("2023-10-01T12:05:00Z", (100.0, 7.0, 50.0))])
+        self.assertFalse(self.grid.provably_clear(parallel, 2.0))  # Neighbouring cells, at any time
+        distant = make_flight("primary", [("2023-10-01T10:00:00Z", (0.0, 25.0, 50.0)),
+                                          ("2023-10-01T10:05:00Z", (100.0, 25.0, 50.0))])
+        self.assertTrue(self.grid.provably_clear(distant, 2.0))
+        self.grid.remove_flight("drone_1")
+        self.assertTrue(self.grid.provably_clear(parallel, 2.0))
+        self.assertEqual(len(self.grid.columns), len({cell[:3] for cell in self.grid.counts}))
+        with self.assertRaises(ValueError):
+            self.grid.provably_clear(distant, 15.0)
+
+    def test_free_slots_over_the_next_hour(self):
+        start = parse_timestamp("2023-10-01T09:55:00Z")
+        slots = self.grid.free_slots(self.mission, start, start + 3600, altitude_offsets=(0.0, 30.0))
+        self.assertNotIn((parse_timestamp("2023-10-01T10:00:00Z"), 0.0), slots)
+        self.assertIn((parse_timestamp("2023-10-01T10:00:00Z"), 30.0), slots)
+        self.assertIn((parse_timestamp("2023-10-01T10:10:00Z"), 0.0), slots)
+        self.assertEqual(slots, sorted(slots))
+
+    def test_density_heatmap(self):
+        heatmap, origin = self.grid.density()
+        self.assertEqual(origin, (0, 0))
+        self.assertEqual(heatmap.shape, (11, 6))
+        self.assertGreater(heatmap[5, 0], 0)
+        self.assertEqual(heatmap[5, 2], 0)
+        empty, _ = self.grid.density(start=parse_timestamp("2023-10-01T12:00:00Z"))
+        self.assertEqual(empty.size, 0)
+
+    def test_free_slots_rasterizes_the_mission_once(self):
+        flights = [make_flight(f"drone_{i}", [("2023-10-01T10:00:00Z", (i * 7.0 % 1000, i * 13.0 % 1000, 50.0)),
+                                              ("2023-10-01T11:00:00Z", (i * 11.0 % 1000, i * 3.0 % 1000, 80.0))])
+                   for i in range(500)]
+        grid = OccupancyGrid.from_schedule({"flights": flights})
+        start = parse_timestamp("2023-10-01T10:00:00Z")
+        with mock.patch.object(grid, "rasterize", wraps=grid.rasterize) as rasterize:
+            grid.free_slots(self.mission, start, start + 3600, altitude_offsets=(0.0, 10.0))
+        self.assertEqual(rasterize.call_count, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import tempfile
+import unittest
+from simulation.result_cache import ResultCache, cache_key, schedule_version
+from simulation.simulator import run_simulation, build_fleet_index
+from helpers import make_mission, timed
+
+def make_track(x_offset=0.0):
+    return make_mission(timed([(x_offset + x, 0.0, 50.0) for x in range(3)], step=60))
+
+CONFLICTS = [{"location": "(1, 0, 50)", "time": None, "involved_flights": ["primary", "drone_1"],
+              "position": (1.0, 0.0, 50.0), "interval": None, "separation": 0.5}]
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache_dir = self.directory.name
+        self.version = "v1"
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_memory_hit_returns_fresh_copy(self):
+        cache = ResultCache()
+        key = cache_key(make_track(), self.version, buffer=2.0)
+        self.assertIsNone(cache.get(key, self.version))
+        cache.put(key, self.version, CONFLICTS)
+        result = cache.get(key, self.version)
+        self.assertEqual(result, CONFLICTS)
+        result[0]["separation"] = 99
+        self.assertEqual(cache.get(key, self.version)[0]["separation"], 0.5)
+        self.assertEqual(cache.stats()["memory_hits"], 2)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_equivalent_missions_share_a_key(self):
+        mission = make_track()
+        respelled = make_track()
+        for waypoint in respelled["waypoints"]:
+            waypoint["timestamp"] = waypoint["timestamp"].replace("Z", "+00:00")
+        self.assertEqual(cache_key(mission, self.version), cache_key(respelled, self.version))
+        self.assertNotEqual(cache_key(mission, self.version), cache_key(make_track(1.0), self.version))
+
+    def test_disk_tier_survives_a_new_cache(self):
+        key = cache_key(make_track(), self.version)
+        ResultCache(cache_dir=self.cache_dir).put(key, self.version, CONFLICTS)
+        cache = ResultCache(cache_dir=self.cache_dir)
+        self.assertEqual(cache.get(key, self.version), CONFLICTS)
+        self.assertEqual(cache.stats()["disk_hits"], 1)
+
+    def test_lru_eviction(self):
+        cache = ResultCache(max_entries=2)
+        keys = [cache_key(make_track(float(i)), self.version) for i in range(3)]
+        cache.put(keys[0], self.version, [])
+        cache.put(keys[1], self.version, [])
+        cache.get(keys[0], self.version)  # keys[1] is now least recently used
+        cache.put(keys[2], self.version, [])
+        self.assertIsNone(cache.get(keys[1], self.version))
+        self.assertEqual(cache.get(keys[0], self.version), [])
+        self.assertEqual(cache.stats()["entries"], 2)
+
+    def test_invalidation_only_deletes_cache_files(self):
+        foreign = os.path.join(self.cache_dir, "notes.txt")
+        with open(foreign, "w") as file:
+            file.write("keep me")
+        cache = ResultCache(cache_dir=self.cache_dir)
+        key = cache_key(make_track(), self.version)
+        cache.put(key, self.version, CONFLICTS)
+        cache.put(key, "v2", CONFLICTS)
+
+        cache.invalidate(self.version)
+        self.assertIsNone(ResultCache(cache_dir=self.cache_dir).get(key, self.version))
+        self.assertEqual(ResultCache(cache_dir=self.cache_dir).get(key, "v2"), CONFLICTS)
+
+        cache.invalidate()
+        self.assertEqual(os.listdir(self.cache_dir), ["notes.txt"])
+        self.assertIsNone(cache.get(key, "v2"))
+
+    def test_schedule_version_is_not_a_path(self):
+        version = "../escape"
+        cache = ResultCache(cache_dir=os.path.join(self.cache_dir, "cache"))
+        key = cache_key(make_track(), version)
+        cache.put(key, version, CONFLICTS)
+        self.assertFalse(os.path.exists(os.path.join(self.cache_dir, "escape")))
+        written = [files for _, _, files in os.walk(os.path.join(self.cache_dir, "cache"))]
+        self.assertIn([f"{key}.json"], written)
+        self.assertEqual(cache.get(key, version), CONFLICTS)
+
+    def test_schedule_change_invalidates(self):
+        schedule = {"flights": []}
+        cache = ResultCache()
+        run_simulation(make_track(), schedule, mode='query', cache=cache)
+        run_simulation(make_track(), schedule, mode='query', cache=cache)
+        self.assertEqual(cache.stats()["hits"], 1)
+        changed = {"flights": [], "version": "edited"}
+        self.assertNotEqual(schedule_version(changed), schedule_version(schedule))
+        run_simulation(make_track(), changed, mode='query', cache=cache)
+        self.assertEqual(cache.stats()["entries"], 1)
+
+    def test_cache_refuses_a_fleet_index(self):
+        schedule = {"flights": []}
+        with self.assertRaises(ValueError):
+            run_simulation(make_track(), schedule, mode='query', fleet_index=build_fleet_index(schedule),
+                           cache=ResultCache())
+
+if __name__ == '__main__':
+    unittest.main()
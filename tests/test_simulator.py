@@ -0,0 +1,30 @@
+import unittest
+from simulation.simulator import is_clear, run_simulation, build_fleet_index
+from helpers import make_flight, timed
+
+class TestIsClear(unittest.TestCase):
+
+    def setUp(self):
+        self.primary = make_flight("primary", timed([(0, 0, 50), (10, 0, 50), (20, 0, 50)]))
+        self.clear_schedule = {"flights": [make_flight("drone_1", timed([(0, 30, 50), (10, 30, 50)]))]}
+        self.busy_schedule = {"flights": [
+            make_flight("drone_1", timed([(0, 30, 50), (10, 30, 50)])),
+            make_flight("drone_2", timed([(10, 1, 50), (10, 20, 50)])),
+        ]}
+
+    def test_clear_mission(self):
+        self.assertTrue(is_clear(self.primary, self.clear_schedule))
+        self.assertEqual(run_simulation(self.primary, self.clear_schedule, mode='query'), [])
+
+    def test_conflicting_mission(self):
+        self.assertFalse(is_clear(self.primary, self.busy_schedule))
+        self.assertTrue(run_simulation(self.primary, self.busy_schedule, mode='query'))
+
+    def test_prebuilt_index(self):
+        index = build_fleet_index(self.busy_schedule)
+        self.assertFalse(is_clear(self.primary, self.busy_schedule, fleet_index=index))
+        distant = make_flight("primary", timed([(100, 100, 50)]))
+        self.assertTrue(is_clear(distant, self.busy_schedule, fleet_index=index))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+import numpy as np
+from deconfliction.fleet_index import find_close_pairs
+from telemetry.monitor import TelemetryMonitor, parse_sample
+from telemetry.replay import replay
+
+def sample(drone_id, t, x, y=0.0, z=50.0):
+    return {"drone_id": drone_id, "t": t, "x": x, "y": y, "z": z}
+
+class TestFindClosePairs(unittest.TestCase):
+
+    def test_find_close_pairs_matches_brute_force(self):
+        rng = np.random.default_rng(3)
+        positions = rng.uniform(-10, 10, size=(300, 3))
+        first, second, distances = find_close_pairs(positions, 1.5)
+        found = set(zip(first.tolist(), second.tolist()))
+        expected = {(i, j) for i in range(len(positions)) for j in range(i + 1, len(positions))
+                    if np.linalg.norm(positions[i] - positions[j]) < 1.5}
+        self.assertEqual(found, expected)
+        self.assertTrue((distances < 1.5).all())
+        self.assertEqual(len(find_close_pairs(positions[:1], 1.5)[0]), 0)
+
+class TestTelemetryMonitor(unittest.TestCase):
+
+    def test_parse_sample(self):
+        self.assertEqual(parse_sample('{"drone_id": 7, "x": 1, "y": 2, "t": 5}'),
+                         {"drone_id": "7", "x": 1.0, "y": 2.0, "z": 0.0, "t": 5.0})
+        self.assertIsNone(parse_sample('{"drone_id": "a", "x": 1}'))
+        self.assertIsNone(parse_sample('   '))
+
+    def test_tracks_are_compared_at_a_common_time(self):
+        # Parallel at 10 m/s, 1 m apart; drone b's latest sample is 0.3 s newer
+        monitor = TelemetryMonitor(separation=2.0, horizon=0.0, horizon_steps=1)
+        for t in (0.0, 1.0):
+            monitor.ingest(sample("a", t, 10 * t), received=t)
+        for t in (0.3, 1.3):
+            monitor.ingest(sample("b", t, 10 * t, y=1.0), received=t)
+        alerts = monitor.check(now=1.3)
+        self.assertEqual(len(alerts), 1)
+        self.assertAlmostEqual(alerts[0]["separation"], 1.0)
+        self.assertEqual(alerts[0]["interval"], (1.3, 1.3))
+
+    def test_predicts_conflict_within_horizon(self):
+        monitor = TelemetryMonitor(separation=2.0, horizon=5.0)
+        for t in (0.0, 1.0):
+            monitor.ingest(sample("a", t, -40 + 10 * t), received=t)
+            monitor.ingest(sample("b", t, 40 - 10 * t), received=t)
+        alerts = monitor.check(now=1.0)
+        self.assertEqual([alert["involved_flights"] for alert in alerts], [["a", "b"]])
+        self.assertAlmostEqual(alerts[0]["time_to_conflict"], 3.0)
+        self.assertAlmostEqual(alerts[0]["separation"], 0.0)
+
+    def test_stale_tracks_are_dropped(self):
+        monitor = TelemetryMonitor(max_age=2.0)
+        for drone_id in ("a", "b", "c"):
+            monitor.ingest(sample(drone_id, 0.0, 0.0), received=0.0)
+        monitor.ingest(sample("c", 2.5, 0.0), received=2.5)
+        monitor.check(now=3.0)
+        self.assertEqual(list(monitor.tracks), ["c"])
+        self.assertEqual((monitor.stats()["drones"], monitor.stats()["dropped"]), (1, 2))
+
+        # A drone that reports again starts afresh instead of extrapolating across the gap
+        monitor.ingest(sample("a", 3.0, 100.0), received=3.0)
+        self.assertEqual(len(monitor.tracks["a"]), 1)
+
+class TestReplay(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "recording.ndjson")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_recording(self, samples):
+        samples = sorted(samples, key=lambda s: s["t"])
+        with open(self.path, "w") as file:
+            file.writelines(json.dumps(s) + "\n" for s in samples)
+
+    def test_unpaced_replay_of_head_on_crossing(self):
+        # 20 s head-on crossing at 10 m/s each, sampled every 0.5 s; they meet at t=10
+        times = np.arange(0.0, 20.5, 0.5)
+        self.write_recording([sample("a", t, -100 + 10 * t) for t in times] +
+                             [sample("b", t, 100 - 10 * t, y=0.5) for t in times])
+        alerts, stats = asyncio.run(replay(self.path, speed=0, tick_interval=0.2, horizon=1.0))
+        self.assertEqual(len(alerts), 1)
+        self.assertEqual(alerts[0]["involved_flights"], ["a", "b"])
+        self.assertGreater(stats["ticks"], 90)
+        self.assertLess(alerts[0]["interval"][0], 10.0 + 1e-9)
+        self.assertGreater(alerts[0]["interval"][0], 8.5)
+
+    def test_stale_track_is_ignored(self):
+        # b stops reporting at t=1 while still heading for a, then a flies through its last position
+        self.write_recording([sample("a", t, 10.0 * t) for t in np.arange(0.0, 8.0, 0.5)] +
+                             [sample("b", t, 50.0) for t in (0.0, 0.5, 1.0)])
+        alerts, _ = asyncio.run(replay(self.path, speed=0, tick_interval=0.2, horizon=1.0, max_age=2.0))
+        self.assertEqual(alerts, [])
+
+    def test_pair_realerts_only_after_clearing(self):
+        # a hovers; b passes it, turns around 30 m later and passes it again
+        times = np.arange(0.0, 12.5, 0.5)
+        positions = np.where(times <= 6.0, -30 + 10 * times, 30 - 10 * (times - 6.0))
+        self.write_recording([sample("a", t, 0.0) for t in times] +
+                             [sample("b", t, x, y=0.5) for t, x in zip(times, positions)])
+        alerts, _ = asyncio.run(replay(self.path, speed=0, tick_interval=0.2, horizon=0.5))
+        self.assertEqual(len(alerts), 2)
+        self.assertLess(alerts[0]["interval"][0], 4.0)
+        self.assertGreater(alerts[1]["interval"][0], 8.0)
+
+    def test_replay_speed_does_not_change_alerts(self):
+        times = np.arange(0.0, 4.5, 0.5)
+        self.write_recording([sample("a", t, -20 + 10 * t) for t in times] +
+                             [sample("b", t, 20 - 10 * t) for t in times])
+        unpaced, _ = asyncio.run(replay(self.path, speed=0, tick_interval=0.2, horizon=1.0))
+        paced, _ = asyncio.run(replay(self.path, speed=100, tick_interval=0.2, horizon=1.0))
+        self.assertEqual([a["interval"] for a in unpaced], [a["interval"] for a in paced])
+        self.assertEqual(len(unpaced), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+from src.deconfliction.time_normalization import (
+    parse_timestamp, format_timestamp, format_iso_timestamp, normalize_flight, RELATIVE_TIME_UNIT
+)
+
+class TestTimeNormalization(unittest.TestCase):
+
+    def test_parse_timestamp_treats_naive_and_zulu_as_utc(self):
+        self.assertEqual(parse_timestamp("2023-10-01T10:00:00Z"), parse_timestamp("2023-10-01T10:00:00"))
+        self.assertEqual(parse_timestamp("2023-10-01T10:00:00+00:00"), 1696154400.0)
+
+    def test_format_round_trip(self):
+        seconds = parse_timestamp("2023-10-01T10:05:00Z")
+        self.assertEqual(format_timestamp(seconds), "2023-10-01 10:05:00")
+        self.assertEqual(format_iso_timestamp(seconds), "2023-10-01T10:05:00Z")
+
+    def test_normalize_both_waypoint_formats(self):
+        window = {"start": "2023-10-01T10:00:00Z", "end": "2023-10-01T10:30:00Z"}
+        start = parse_timestamp(window["start"])
+        absolute = normalize_flight({
+            "waypoints": [{"x": 0, "y": 0, "z": 10, "timestamp": "2023-10-01T10:05:00Z"}],
+            "time_window": window
+        }, drone_id="primary")
+        relative = normalize_flight({
+            "drone_id": "drone_1",
+            "waypoints": [{"x": 1, "y": 2, "time": 0.5}],
+            "time_window": window
+        })
+        self.assertEqual(absolute["times"][0], start + 300)
+        self.assertEqual(relative["times"][0], start + 0.5 * RELATIVE_TIME_UNIT)
+        self.assertEqual(relative["drone_id"], "drone_1")
+        self.assertEqual(relative["positions"].tolist(), [[1.0, 2.0, 0.0]])
+
+    def test_missing_time_is_nan(self):
+        flight = normalize_flight({
+            "drone_id": "drone_1",
+            "waypoints": [{"x": 1, "y": 2, "z": 3}],
+            "time_window": {"start": "2023-10-01T10:00:00Z", "end": "2023-10-01T10:30:00Z"}
+        })
+        self.assertTrue(flight["times"][0] != flight["times"][0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from PIL import Image
+from simulation.visualization import (precompute_animation, export_conflict_animation, _encode_frames,
+                                      decimate_paths, flights_within_radius)
+from helpers import make_flight, untimed
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+class TestAnimationExport(unittest.TestCase):
+
+    def setUp(self):
+        self.primary = make_flight("primary", untimed([(0, 0, 10), (10, 0, 10), (20, 5, 10)]))
+        self.flights = {"flights": [make_flight("drone_1", untimed([(10, -5, 10), (10, 5, 10)]))]}
+        self.conflicts = [
+            {"location": "(10, 0, 10)", "time": None, "involved_flights": ["primary", "drone_1"],
+             "position": (10.0, 0.0, 10.0)},
+            {"location": "(20, 5, 10)", "time": None, "involved_flights": ["primary", "drone_1"]},
+        ]
+
+    def test_precompute_animation(self):
+        scene = precompute_animation(self.conflicts, self.primary, self.flights, num_frames=250)
+        self.assertEqual(len(scene['tracks']), 2)
+        self.assertEqual(scene['visible'].shape, (2, 250))
+        self.assertEqual(scene['conflict_index'][[0, 99, 100, 200]].tolist(), [0, 0, 1, 0])
+        np.testing.assert_array_equal(scene['conflict_positions'], [[10, 0, 10], [20, 5, 10]])
+        low, high = scene['limits']
+        np.testing.assert_array_equal(low, [-2, -7, 8])
+        np.testing.assert_array_equal(high, [22, 7, 12])
+
+    def test_parallel_gif_export(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "conflicts.gif")
+            result = export_conflict_animation(self.conflicts, self.primary, self.flights, path,
+                                               size=(160, 120), dpi=40, num_frames=6, workers=2)
+            self.assertEqual(result, path)
+            with Image.open(path) as gif:
+                self.assertEqual(gif.n_frames, 6)
+
+    def test_no_conflicts_and_unknown_format(self):
+        self.assertIsNone(export_conflict_animation([], self.primary, self.flights, "unused.gif"))
+        with self.assertRaises(ValueError):
+            export_conflict_animation(self.conflicts, self.primary, self.flights, "out.avi")
+
+    @unittest.skipIf(resource is None, "needs the resource module")
+    def test_gif_encoding_keeps_few_files_open(self):
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        with tempfile.TemporaryDirectory() as directory:
+            for frame in range(120):
+                Image.new('RGB', (8, 8), (frame, 0, 0)).save(os.path.join(directory, f'frame_{frame:05d}.png'))
+            path = os.path.join(directory, "frames.gif")
+            resource.setrlimit(resource.RLIMIT_NOFILE, (64, hard))
+            try:
+                _encode_frames(directory, 120, path, fps=20)
+            finally:
+                resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+            with Image.open(path) as gif:
+                self.assertEqual(gif.n_frames, 120)
+
+class TestLargeFleetHelpers(unittest.TestCase):
+
+    def test_decimate_paths_keeps_endpoints_and_changed_cells(self):
+        paths = [np.array([[0.0, 0, 0], [0.1, 0, 0], [0.2, 0, 0], [1.5, 0, 0], [1.6, 0, 0]]),
+                 np.array([[5.0, 5, 5], [5.1, 5, 5]])]
+        decimated = decimate_paths(paths, tolerance=1.0)
+        np.testing.assert_array_equal(decimated[0], [[0, 0, 0], [1.5, 0, 0], [1.6, 0, 0]])
+        np.testing.assert_array_equal(decimated[1], paths[1])
+        self.assertIs(decimate_paths(paths, 0), paths)
+        self.assertEqual(decimate_paths([], 1.0), [])
+
+    def test_flights_within_radius_uses_leg_distance(self):
+        primary = make_flight("primary", untimed([(0, 0, 10), (600, 0, 10)]))
+        crossing = make_flight("crossing", untimed([(300, -300, 10), (300, 300, 10)]))
+        parallel = make_flight("parallel", untimed([(0, 4, 10), (600, 4, 10)]))
+        far = make_flight("far", untimed([(0, 50, 10), (600, 50, 10)]))
+        hovering = make_flight("hovering", untimed([(300, 2, 10)]))
+        fleet = {"flights": [crossing, parallel, far, hovering]}
+        near = flights_within_radius(primary, fleet, radius=5.0)
+        self.assertEqual([flight["drone_id"] for flight in near], ["crossing", "parallel", "hovering"])
+        self.assertEqual(flights_within_radius(primary, {"flights": []}, 5.0), [])
+
+if __name__ == '__main__':
+    unittest.main()